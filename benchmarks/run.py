@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""
+Times the checks of ``AdminSiteSmokeTestMixin`` against a synthetic admin
+site with ``--models`` models and ModelAdmins::
+
+    python -m benchmarks.run --models 500
+
+The timings are added to ``--output`` (``benchmarks/results.json``) under the
+current git commit and the number of models, so runs of different commits
+can be compared.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+import unittest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'describe', '--always', '--dirty'],
+            cwd=BASE_DIR).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def timed(fn, *args):
+    start = timeit.default_timer()
+    result = fn(*args)
+    return timeit.default_timer() - start, result
+
+
+def run_checks(test_case):
+    """
+    Runs every check of ``test_case``, returns how long each took and
+    whether it passed.
+    """
+    checks = {}
+    for name in sorted(dir(test_case)):
+        if not name.startswith('test_'):
+            continue
+        result = unittest.TestResult()
+        elapsed, _ = timed(test_case(name).run, result)
+        checks[name] = {
+            'time': elapsed,
+            'passed': result.wasSuccessful(),
+        }
+    return checks
+
+
+def benchmark(models):
+    os.environ['SMOKE_BENCHMARK_MODELS'] = str(models)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    sys.path.insert(0, BASE_DIR)
+
+    import django
+    setup = {}
+    setup['django_setup'], _ = timed(django.setup)
+
+    from django.test import TestCase
+    from django.test.runner import DiscoverRunner
+    from django.test.utils import (setup_test_environment,
+        teardown_test_environment)
+    from django_admin_smoke_tests.tests import AdminSiteSmokeTestMixin
+
+    class SyntheticAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
+        fixtures = []
+        exclude_apps = ['auth']
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    setup['databases'], old_config = timed(runner.setup_databases)
+    try:
+        setup['test_case'], _ = timed(SyntheticAdminSiteSmokeTest.setUpClass)
+        try:
+            checks = run_checks(SyntheticAdminSiteSmokeTest)
+        finally:
+            SyntheticAdminSiteSmokeTest.tearDownClass()
+    finally:
+        runner.teardown_databases(old_config)
+        teardown_test_environment()
+
+    total = sum(setup.values()) + sum(
+        check['time'] for check in checks.values())
+    return {
+        'models': models,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'setup': setup,
+        'checks': checks,
+        'total': total,
+    }
+
+
+def save(path, commit, run):
+    results = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            results = json.load(f)
+    results.setdefault(commit, {})[str(run['models'])] = run
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--models', type=int, default=100,
+        help='number of models and ModelAdmins to generate')
+    parser.add_argument('--output',
+        default=os.path.join(BASE_DIR, 'benchmarks', 'results.json'),
+        help='JSON file to add the results to')
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    run = benchmark(args.models)
+    save(args.output, commit, run)
+
+    print('%s, %d models' % (commit, args.models))
+    for name, elapsed in sorted(run['setup'].items()):
+        print('  setup %-30s %8.3fs' % (name, elapsed))
+    for name, check in sorted(run['checks'].items()):
+        print('  %-36s %8.3fs%s' % (name, check['time'],
+            '' if check['passed'] else '  FAILED'))
+    print('  %-36s %8.3fs' % ('total', run['total']))
+
+
+if __name__ == '__main__':
+    main()
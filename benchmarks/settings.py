@@ -0,0 +1,24 @@
+"""
+Settings for the benchmarks: the test project with its app replaced by the
+synthetic app.
+"""
+from test_project.settings import *  # noqa
+
+INSTALLED_APPS = (
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'benchmarks.synthetic',
+)
+
+ROOT_URLCONF = 'benchmarks.urls'
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
@@ -0,0 +1,5 @@
+import os
+
+
+# number of models (and ModelAdmins) to generate, set by the benchmark runner
+MODEL_COUNT = int(os.environ.get('SMOKE_BENCHMARK_MODELS', 100))
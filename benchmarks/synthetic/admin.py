@@ -0,0 +1,28 @@
+from django.contrib import admin
+
+from .models import generated
+
+
+def make_model_admin(model):
+    field_names = [field.name for field in model._meta.get_fields()]
+    relations = [name for name in ('parent', 'tags') if name in field_names]
+
+    attrs = {
+        'list_display': ['name', 'slug', 'number', 'active', 'created'],
+        'list_filter': ['active', 'created'],
+        'search_fields': ['name', 'slug'],
+        'fieldsets': [
+            (None, {'fields': ['name', 'slug'] + relations}),
+            ('Details', {'fields': ['number', 'active', 'notes']}),
+        ],
+    }
+    if 'parent' in relations:
+        attrs['list_display'].append('parent')
+        attrs['list_filter'].append('parent')
+        attrs['search_fields'].append('parent__name')
+        attrs['list_select_related'] = ['parent']
+    return type('%sAdmin' % model.__name__, (admin.ModelAdmin,), attrs)
+
+
+for model in generated:
+    admin.site.register(model, make_model_admin(model))
@@ -0,0 +1,43 @@
+"""
+Generates ``MODEL_COUNT`` models. Every model but the first has a foreign key
+to an earlier one, so they form a tree, and every fifth model also has a
+many-to-many field.
+"""
+from django.db import models
+from django.utils.encoding import python_2_unicode_compatible
+
+from . import MODEL_COUNT
+
+
+@python_2_unicode_compatible
+class SyntheticModel(models.Model):
+    name = models.CharField(max_length=100)
+    slug = models.SlugField()
+    number = models.IntegerField(default=0)
+    active = models.BooleanField(default=True)
+    created = models.DateTimeField(auto_now_add=True)
+    notes = models.TextField(blank=True)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return self.name
+
+
+def make_model(index, parents):
+    attrs = {'__module__': __name__}
+    if parents:
+        attrs['parent'] = models.ForeignKey(parents[(index - 1) // 2],
+            on_delete=models.CASCADE, related_name='+')
+    if index % 5 == 4:
+        attrs['tags'] = models.ManyToManyField(parents[index - 1],
+            blank=True, related_name='+')
+    return type('Synthetic%04d' % index, (SyntheticModel,), attrs)
+
+
+generated = []
+for index in range(MODEL_COUNT):
+    model = make_model(index, generated)
+    globals()[model.__name__] = model
+    generated.append(model)
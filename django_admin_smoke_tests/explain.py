@@ -0,0 +1,117 @@
+import re
+
+from django.db import connections
+
+try:
+    from django.core.exceptions import EmptyResultSet
+except ImportError:  # Django<1.9
+    from django.db.models.sql.datastructures import EmptyResultSet
+
+
+# statements that make each database explain a query instead of running it
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN',
+    'postgresql': 'EXPLAIN',
+    'mysql': 'EXPLAIN',
+}
+
+
+def explain_sql(connection, sql, params=()):
+    """
+    Returns the rows of the database's query plan for ``sql``, as dicts by
+    column name.
+    """
+    try:
+        prefix = EXPLAIN_PREFIXES[connection.vendor]
+    except KeyError:
+        raise NotImplementedError(
+            "Can't explain queries on %s" % connection.vendor)
+
+    with connection.cursor() as cursor:
+        cursor.execute('%s %s' % (prefix, sql), params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _explain(queryset):
+    connection = connections[queryset.db]
+    try:
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    except EmptyResultSet:
+        # the queryset can't match any rows (e.g. .none()), so Django never
+        # runs it
+        return connection, []
+    return connection, explain_sql(connection, sql, params)
+
+
+def explain(queryset):
+    """
+    Compiles ``queryset`` and returns the rows of the database's query plan
+    for it, without fetching any of its rows. The plan of a queryset that
+    can't match any rows is empty.
+    """
+    return _explain(queryset)[1]
+
+
+# query plan columns with the steps of the plan as text
+PLAN_COLUMNS = {
+    'sqlite': 'detail',
+    'postgresql': 'QUERY PLAN',
+}
+
+SCAN_PATTERNS = {
+    'sqlite': re.compile(r'^SCAN (?:TABLE )?(\S+)'),
+    'postgresql': re.compile(r'Seq Scan on (\S+)'),
+}
+
+# steps of a query plan that sort rows instead of reading them in order from
+# an index
+SORT_PATTERNS = {
+    'sqlite': re.compile(r'USE TEMP B-TREE FOR ORDER BY'),
+    'postgresql': re.compile(r'^\s*(?:->\s*)?Sort\b'),
+}
+
+
+def plan_lines(connection, plan):
+    """
+    Returns the steps of a query plan returned by ``explain_sql`` as text.
+    """
+    try:
+        column = PLAN_COLUMNS[connection.vendor]
+    except KeyError:
+        raise NotImplementedError(
+            "Can't analyse query plans on %s" % connection.vendor)
+    return [row[column] for row in plan]
+
+
+def scanned_tables(queryset):
+    """
+    Returns the names of the tables the database reads completely to run
+    ``queryset``, according to its query plan.
+    """
+    connection, plan = _explain(queryset)
+
+    if connection.vendor == 'mysql':
+        return [row['table'] for row in plan if row['type'] == 'ALL']
+
+    tables = []
+    for line in plan_lines(connection, plan):
+        match = SCAN_PATTERNS[connection.vendor].search(line)
+        if match:
+            tables.append(match.group(1).strip('"'))
+    return tables
+
+
+def unindexed_sorts(queryset):
+    """
+    Returns the steps of the query plan for ``queryset`` that sort its rows
+    without an index.
+    """
+    connection, plan = _explain(queryset)
+
+    if connection.vendor == 'mysql':
+        return [row['Extra'] for row in plan
+            if 'Using filesort' in (row['Extra'] or '')]
+
+    return [line for line in plan_lines(connection, plan)
+        if SORT_PATTERNS[connection.vendor].search(line)]
@@ -0,0 +1,103 @@
+import datetime
+
+from django import forms
+from django.utils import timezone
+
+import six
+
+
+def _format(value):
+    value = getattr(value, 'pk', value)
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, datetime.time):
+        return value.strftime('%H:%M:%S')
+    return six.text_type(value)
+
+
+def _field_data(bound_field):
+    value = bound_field.value()
+    widget = bound_field.field.widget
+    name = bound_field.html_name
+
+    if isinstance(widget, forms.MultiWidget):
+        if not isinstance(value, (list, tuple)):
+            value = widget.decompress(value)
+        return dict(
+            ('%s_%d' % (name, i), '' if v is None else _format(v))
+            for i, v in enumerate(value)
+        )
+    if isinstance(widget, forms.FileInput):
+        # files can't be resubmitted, the current one is kept when empty
+        return {}
+    if isinstance(widget, forms.CheckboxInput):
+        return {name: 'on'} if value else {}
+    if value is None:
+        return {name: ''}
+    if isinstance(value, (list, tuple)):
+        return {name: [_format(v) for v in value]}
+    return {name: _format(value)}
+
+
+def form_data(form):
+    """
+    Returns POST data that submits ``form`` with its initial values.
+    """
+    data = {}
+    for name in form.fields:
+        data.update(_field_data(form[name]))
+    return data
+
+
+def formset_data(formset):
+    """
+    Returns POST data that submits the existing forms of ``formset`` with
+    their initial values.
+    """
+    data = form_data(formset.management_form)
+    data['%s-TOTAL_FORMS' % formset.prefix] = str(len(formset.initial_forms))
+    for form in formset.initial_forms:
+        data.update(form_data(form))
+    return data
+
+
+def change_form_data(response):
+    """
+    Returns POST data that submits the change form and inline formsets
+    rendered in the admin change view ``response`` unchanged.
+    """
+    context = getattr(response, 'context_data', None) or {}
+    if 'adminform' not in context:
+        return {}
+
+    data = form_data(context['adminform'].form)
+    for inline_admin_formset in context.get('inline_admin_formsets', []):
+        data.update(formset_data(inline_admin_formset.formset))
+    data['_save'] = 'Save'
+    return data
+
+
+def change_form_errors(response):
+    """
+    Returns the errors of the change form and inline formsets rendered in
+    the admin change view ``response``, as lines of text.
+    """
+    context = getattr(response, 'context_data', None) or {}
+    if 'adminform' not in context:
+        return []
+
+    errors = []
+    form = context['adminform'].form
+    for name, messages in sorted(form.errors.items()):
+        errors.append('%s: %s' % (name, ' '.join(messages)))
+    for inline_admin_formset in context.get('inline_admin_formsets', []):
+        formset = inline_admin_formset.formset
+        for message in formset.non_form_errors():
+            errors.append('%s: %s' % (formset.prefix, message))
+        for index, form_errors in enumerate(formset.errors):
+            for name, messages in sorted(form_errors.items()):
+                errors.append('%s-%d-%s: %s' % (
+                    formset.prefix, index, name, ' '.join(messages)))
+    return errors
@@ -0,0 +1,178 @@
+import inspect
+import json
+import os
+
+import django
+
+from django.db.migrations.loader import MigrationLoader
+from django.template import TemplateDoesNotExist
+from django.template.loader import select_template
+
+import six
+
+from .instances import related_model, remote_field
+from .utils import JSONStore, sha1_hexdigest
+
+
+# templates rendered by the checks, besides the ones set on the ModelAdmin
+ADMIN_TEMPLATES = ('change_list.html', 'change_form.html')
+
+TEMPLATE_ATTRIBUTES = (
+    'add_form_template',
+    'change_form_template',
+    'change_list_template',
+)
+
+
+def _class_sources(cls):
+    for klass in inspect.getmro(cls):
+        # Django's own classes only change with the Django version
+        if klass.__module__.split('.')[0] in ('django', 'six', 'builtins',
+                '__builtin__'):
+            continue
+        try:
+            yield inspect.getsource(klass)
+        except (IOError, TypeError):
+            yield '%s.%s' % (klass.__module__, klass.__name__)
+
+
+def _template_names(model, model_admin):
+    opts = model._meta
+    for template in ADMIN_TEMPLATES:
+        yield [
+            'admin/%s/%s/%s' % (opts.app_label, opts.model_name, template),
+            'admin/%s/%s' % (opts.app_label, template),
+            'admin/%s' % template,
+        ]
+    for attr in TEMPLATE_ATTRIBUTES:
+        names = getattr(model_admin, attr, None)
+        if names:
+            yield [names] if isinstance(names, six.string_types) else names
+
+
+def _template_sources(model, model_admin):
+    for names in _template_names(model, model_admin):
+        try:
+            template = select_template(names)
+        except TemplateDoesNotExist:
+            yield repr(names)
+            continue
+
+        # Django<1.9
+        origin = getattr(template, 'origin', None) or template.template.origin
+        if origin.name and os.path.exists(origin.name):
+            with open(origin.name) as f:
+                yield f.read()
+        else:
+            yield repr(origin.name)
+
+
+def _migrations(app_label):
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    return sorted(
+        name for label, name in loader.disk_migrations
+        if label == app_label
+    )
+
+
+def _list_filter_classes(model_admin):
+    for list_filter in getattr(model_admin, 'list_filter', ()):
+        if isinstance(list_filter, (tuple, list)):
+            list_filter = list_filter[1]
+        if not isinstance(list_filter, six.string_types):
+            yield list_filter
+
+
+def _related_models(model):
+    fields = list(model._meta.concrete_fields) + list(
+        model._meta.many_to_many)
+    related = set(related_model(field) for field in fields
+        if remote_field(field))
+    return sorted(related, key=lambda model: str(model._meta))
+
+
+def fingerprint(model, model_admin):
+    """
+    Returns a hash of everything a ModelAdmin's checks depend on: the source
+    of the ModelAdmin, its form, inlines, list filters, model and the models
+    it relates to, the templates it renders, its app's migrations and the
+    Django version.
+    """
+    inlines = list(getattr(model_admin, 'inlines', []))
+    classes = [model_admin.__class__, model_admin.form, model]
+    classes += inlines
+    classes += list(_list_filter_classes(model_admin))
+    classes += _related_models(model)
+    classes += [inline.model for inline in inlines]
+
+    parts = [django.get_version()]
+    for cls in classes:
+        parts += _class_sources(cls)
+    parts += _template_sources(model, model_admin)
+    parts += _migrations(model._meta.app_label)
+
+    return sha1_hexdigest(parts)
+
+
+# attributes of test case classes that don't change the checks' results
+IGNORED_SETTINGS = (
+    'check_durations_path',
+    'collect_failures',
+    'full_run',
+    'incremental_results_path',
+    'profile_dir',
+    'report_dir',
+    'settings_fingerprint',
+)
+
+
+def _package_sources():
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith('.py'):
+                with open(os.path.join(root, name), 'rb') as f:
+                    yield f.read()
+
+
+def settings_fingerprint(test_case):
+    """
+    Returns a hash of the settings of a test case class, i.e. its attributes
+    with JSON values, and of the source of the smoke tests themselves.
+    """
+    parts = []
+    for name in sorted(dir(test_case)):
+        if name.startswith('_') or name in IGNORED_SETTINGS:
+            continue
+        value = getattr(test_case, name)
+        if callable(value):
+            continue
+        try:
+            parts.append('%s=%s' % (name, json.dumps(value, sort_keys=True)))
+        except (TypeError, ValueError):
+            continue
+    parts += _package_sources()
+
+    return sha1_hexdigest(parts)
+
+
+class IncrementalResults(JSONStore):
+    """
+    The checks that passed for each ModelAdmin fingerprint, stored in a JSON
+    file so later runs can skip them while the fingerprint stays the same.
+    """
+
+    def has_passed(self, fingerprint, check):
+        return check in self.data.get(fingerprint, [])
+
+    def add_pass(self, fingerprint, check):
+        checks = self.data.setdefault(fingerprint, [])
+        if check not in checks:
+            checks.append(check)
+
+    def merge(self, saved):
+        for fingerprint, checks in self.data.items():
+            saved[fingerprint] = sorted(
+                set(saved.get(fingerprint, [])) | set(checks))
+        return saved
@@ -0,0 +1,309 @@
+import datetime
+import decimal
+import itertools
+import logging
+import uuid
+
+from django.db import IntegrityError, models, router, transaction
+from django.utils import timezone
+
+import six
+
+
+logger = logging.getLogger(__name__)
+
+_counter = itertools.count(1)
+
+
+def _text_value(field, n):
+    if isinstance(field, models.EmailField):
+        value = 'smoke%d@example.com' % n
+    elif isinstance(field, models.URLField):
+        value = 'http://example.com/%d/' % n
+    elif isinstance(field, models.SlugField):
+        value = 'smoke-%d' % n
+    else:
+        value = 'smoke %d' % n
+
+    max_length = field.max_length
+    if max_length and len(value) > max_length:
+        # keep the number, which is what makes the value unique
+        value = str(n)[-max_length:]
+    return value
+
+
+def _number_value(field, n):
+    if isinstance(field, models.DecimalField):
+        integer_digits = field.max_digits - field.decimal_places
+        return decimal.Decimal(n % (10 ** integer_digits))
+    if isinstance(field, models.FloatField):
+        return float(n)
+    if isinstance(field, models.SmallIntegerField):
+        return n % 32767
+    return n
+
+
+def _optional_field_class(name):
+    # fields that don't exist in all supported Django versions
+    return getattr(models, name, ())
+
+
+FIELD_VALUES = [
+    ((models.BooleanField, models.NullBooleanField), lambda f, n: False),
+    ((models.IntegerField, models.FloatField, models.DecimalField),
+        _number_value),
+    (models.DateTimeField, lambda f, n: timezone.now()),
+    (models.DateField, lambda f, n: datetime.date.today()),
+    (models.TimeField, lambda f, n: datetime.time(n % 24)),
+    (_optional_field_class('DurationField'),
+        lambda f, n: datetime.timedelta(seconds=n)),
+    (_optional_field_class('UUIDField'), lambda f, n: uuid.uuid4()),
+    (models.GenericIPAddressField,
+        lambda f, n: '10.%d.%d.%d' % (n >> 16 & 255, n >> 8 & 255, n & 255)),
+    (models.BinaryField, lambda f, n: six.b('')),
+    (models.FileField, lambda f, n: 'smoke/%d.txt' % n),
+    ((models.CharField, models.TextField), _text_value),
+]
+
+
+def field_value(field, n):
+    """
+    Returns a valid value for ``field``, unique for every ``n`` unless it
+    runs out of choices.
+    """
+    if field.choices:
+        choices = field.flatchoices
+        return choices[n % len(choices)][0]
+
+    for field_class, get_value in FIELD_VALUES:
+        if isinstance(field, field_class):
+            return get_value(field, n)
+
+    if field.null:
+        return None
+    raise ValueError("Can't generate a value for %s" % field)
+
+
+def remote_field(field):
+    # Django<1.9
+    return field.remote_field if hasattr(field, 'remote_field') else field.rel
+
+
+def related_model(field):
+    rel = remote_field(field)
+    # Django<1.8
+    return rel.model if hasattr(rel, 'model') else rel.to
+
+
+def needs_value(field):
+    """
+    Whether ``field`` has to be given a value to create a valid instance.
+    """
+    if isinstance(field, models.AutoField) or field.null:
+        return False
+    if getattr(field, 'auto_now', False) or\
+            getattr(field, 'auto_now_add', False):
+        return False
+    if remote_field(field):
+        # defaults of foreign keys are often set at runtime (e.g. to the
+        # current user by a ModelAdmin), so they can't be relied on
+        return True
+    if field.has_default():
+        # empty defaults of required fields wouldn't pass form validation
+        return field.unique or field.primary_key or (
+            not field.blank and field.get_default() in field.empty_values)
+    return True
+
+
+def _is_parent_link(field):
+    rel = remote_field(field)
+    return bool(rel and getattr(rel, 'parent_link', False))
+
+
+def required_relations(model):
+    """
+    Returns the foreign key fields of ``model`` that can't be left empty.
+    """
+    return [
+        field for field in model._meta.concrete_fields
+        if remote_field(field) and not _is_parent_link(field) and
+        needs_value(field)
+    ]
+
+
+def build_instance(model, related=None):
+    """
+    Returns an unsaved instance of ``model`` with a value for every required
+    field. Required foreign keys are taken from ``related``, a dict by field
+    name of either a related instance or a list of primary keys to spread the
+    instances over. Missing ones are created.
+    """
+    related = related if related is not None else {}
+    n = next(_counter)
+    instance = model()
+
+    for field in model._meta.concrete_fields:
+        if _is_parent_link(field) or not needs_value(field):
+            continue
+
+        if not remote_field(field):
+            setattr(instance, field.attname, field_value(field, n))
+        elif isinstance(related.get(field.name), list) and not field.unique:
+            pks = related[field.name]
+            setattr(instance, field.attname, pks[n % len(pks)])
+        else:
+            if field.name not in related or field.unique:
+                related[field.name] = create_instance(related_model(field))
+            setattr(instance, field.name, related[field.name])
+
+    return instance
+
+
+def create_instance(model):
+    """
+    Saves and returns a new instance of ``model``.
+    """
+    instance = build_instance(model)
+    instance.save(force_insert=True)
+    return instance
+
+
+def create_instances(model, count, related=None):
+    """
+    Creates ``count`` instances of ``model``, along with one instance of each
+    model they require a foreign key to, unless given in ``related`` (see
+    ``build_instance``). Depending on the database, the instances might be
+    bulk created without getting their primary keys set.
+    """
+    related = related if related is not None else {}
+    instances = [build_instance(model, related) for _ in range(count)]
+
+    if model._meta.parents or model._meta.proxy:
+        # bulk_create() doesn't support multi-table inheritance or proxies
+        for instance in instances:
+            instance.save(force_insert=True)
+        return instances
+
+    model._default_manager.bulk_create(instances)
+    return instances
+
+
+def dependency_order(models):
+    """
+    Returns the concrete models of ``models`` and the models they require
+    foreign keys to, with every model coming after the models it depends on.
+    """
+    ordered = []
+
+    def visit(model, path):
+        model = model._meta.concrete_model
+        if model in ordered or model in path:
+            return
+        for field in required_relations(model):
+            visit(related_model(field), path + [model])
+        ordered.append(model)
+
+    for model in models:
+        visit(model, [])
+    return ordered
+
+
+def unique_choices(model):
+    """
+    Returns the number of rows ``model`` can have given the choices of its
+    unique fields, or None if it has no unique fields with choices.
+    """
+    counts = [
+        len(field.flatchoices) for field in model._meta.concrete_fields
+        if field.unique and field.choices
+    ]
+    return min(counts) if counts else None
+
+
+def seed(models, rows, batch_size=1000):
+    """
+    Makes sure every model in ``models``, and every model they require
+    foreign keys to, has at least ``rows`` rows. Rows are bulk created in
+    batches of ``batch_size``, in dependency order, with foreign keys spread
+    over the first ``batch_size`` rows of the related tables. Models with
+    fields no value can be generated for, or with unique fields that run out
+    of choices or values, are logged and left out.
+    """
+    for model in dependency_order(models):
+        model_rows = rows
+        limit = unique_choices(model)
+        if limit is not None and limit < rows:
+            logger.warning('Only seeding %s with %d rows, the number of '
+                'choices of its unique fields', model._meta, limit)
+            model_rows = limit
+
+        remaining = model_rows - model._default_manager.count()
+        if remaining <= 0:
+            continue
+
+        related = {}
+        for field in required_relations(model):
+            related[field.name] = list(
+                related_model(field)._default_manager.values_list(
+                    'pk', flat=True)[:batch_size])
+
+        try:
+            while remaining > 0:
+                with transaction.atomic(using=router.db_for_write(model)):
+                    create_instances(model, min(batch_size, remaining),
+                        related)
+                remaining -= batch_size
+        except (ValueError, IntegrityError) as e:
+            logger.warning('Not seeding %s: %s', model._meta, e)
+
+
+def _many_to_many(model):
+    """
+    Returns the many-to-many fields of ``model`` that don't use a custom
+    intermediate model, along with the models they relate to.
+    """
+    return [
+        (field, related_model(field)._meta.concrete_model)
+        for field in model._meta.many_to_many
+        if remote_field(field).through._meta.auto_created
+    ]
+
+
+def create_object_graph(models):
+    """
+    Makes sure every model in ``models``, and every model they relate to, has
+    at least one row, creating the missing ones in dependency order with
+    their foreign keys and many-to-many relations pointing at each other.
+    Returns an instance of every concrete model by model. Models with fields
+    no value can be generated for are logged and left out.
+    """
+    models = list(models)
+    for model in list(models):
+        models += [target for field, target in _many_to_many(model)]
+
+    instances = {}
+    created = []
+    for model in dependency_order(models):
+        instance = model._default_manager.last()
+        if instance is None:
+            related = dict(
+                (field.name, instances[related_model(field)])
+                for field in required_relations(model)
+                if related_model(field) in instances and not field.unique
+            )
+            try:
+                instance = build_instance(model, related)
+            except ValueError as e:
+                logger.warning('Not generating an instance of %s: %s',
+                    model._meta, e)
+                continue
+            instance.save(force_insert=True)
+            created.append(instance)
+        instances[model] = instance
+
+    for instance in created:
+        for field, target in _many_to_many(instance.__class__):
+            if target in instances:
+                getattr(instance, field.name).add(instances[target])
+
+    return instances
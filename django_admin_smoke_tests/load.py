@@ -0,0 +1,277 @@
+import math
+import os
+import threading
+import timeit
+
+import django
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.admin.utils import quote
+from django.core.servers.basehttp import WSGIServer
+from django.db import connections
+from django.test.client import RequestFactory
+from django.test.testcases import LiveServerThread, QuietWSGIRequestHandler
+from django.test.utils import override_settings
+
+import six
+from six.moves import queue, socketserver
+from six.moves.urllib.error import HTTPError, URLError
+from six.moves.urllib.request import Request, urlopen
+
+from .instances import create_object_graph
+from .report import SmokeReport
+from .tests import get_model_admins
+
+try:
+    from django.urls import reverse
+except ImportError:  # Django<1.10
+    from django.core.urlresolvers import reverse
+
+
+def percentile(values, percent):
+    """
+    Returns the nearest-rank ``percent`` percentile of ``values``.
+    """
+    values = sorted(values)
+    if not values:
+        return None
+    rank = int(math.ceil(percent / 100.0 * len(values)))
+    return values[max(rank, 1) - 1]
+
+
+class ThreadedWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    """
+    A WSGI server handling each request in a thread of its own. Request
+    threads use the ``connections_override`` database connections (in-memory
+    SQLite databases other threads can't open), which can only serve one
+    request at a time. ``peak`` is the largest number of requests it handled
+    at once.
+    """
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        self.connections_override = kwargs.pop('connections_override', None)
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.override_lock = threading.Lock()
+        super(ThreadedWSGIServer, self).__init__(*args, **kwargs)
+
+    def process_request_thread(self, request, client_address):
+        if self.connections_override:
+            self.override_lock.acquire()
+            for alias, conn in self.connections_override.items():
+                connections[alias] = conn
+        try:
+            super(ThreadedWSGIServer, self).process_request_thread(
+                request, client_address)
+        finally:
+            if self.connections_override:
+                self.override_lock.release()
+
+    def finish_request(self, request, client_address):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            super(ThreadedWSGIServer, self).finish_request(
+                request, client_address)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def close_request(self, request):
+        # connections opened by the request's thread would otherwise leak
+        connections.close_all()
+        super(ThreadedWSGIServer, self).close_request(request)
+
+
+class ThreadedLiveServerThread(LiveServerThread):
+    def _create_server(self, port=None):
+        # Django>=1.11 binds to self.port
+        if port is None:
+            port = self.port
+        # request threads open their own connections to in-memory SQLite
+        # databases in shared cache mode
+        connections_override = dict(
+            (alias, conn)
+            for alias, conn in (self.connections_override or {}).items()
+            if not getattr(conn.features, 'can_share_in_memory_db', False))
+        return ThreadedWSGIServer((self.host, port), QuietWSGIRequestHandler,
+            allow_reuse_address=False,
+            connections_override=connections_override)
+
+
+class AdminSiteLoadTestMixin(object):
+    """
+    Requests the changelist, search and change pages of every ModelAdmin
+    from several threads at once, against a live server handling each request
+    in a thread of its own. Use with ``LiveServerTestCase``::
+
+        class AdminSiteLoadTest(AdminSiteLoadTestMixin, LiveServerTestCase):
+            load_threads = 8
+
+    The requests per second, latency percentiles and the number of requests
+    the server handled at once for every page are added to the report.
+    Responses with server errors fail the test.
+    """
+    modeladmins = None
+    exclude_apps = []
+    exclude_modeladmins = []
+
+    shard_index = 0
+    shard_count = 1
+
+    # number of threads requesting each page at the same time, and number of
+    # requests made to each page
+    load_threads = 4
+    load_requests = 20
+    load_timeout = 30
+
+    report_dir = os.environ.get('SMOKE_TESTS_REPORT_DIR')
+
+    password_hashers = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+    @classmethod
+    def setUpClass(cls):
+        cls.report = SmokeReport(cls.__name__)
+        super(AdminSiteLoadTestMixin, cls).setUpClass()
+
+    # Django>=1.11
+    server_thread_class = ThreadedLiveServerThread
+
+    if django.VERSION < (1, 11):
+        @classmethod
+        def _create_server_thread(cls, host, possible_ports,
+                connections_override):
+            # Django<1.10 has no hook for the server, and serves one request
+            # at a time
+            return ThreadedLiveServerThread(host, possible_ports,
+                cls.static_handler, connections_override=connections_override)
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.report_dir:
+            cls.report.write(cls.report_dir)
+        super(AdminSiteLoadTestMixin, cls).tearDownClass()
+
+    def setUp(self):
+        super(AdminSiteLoadTestMixin, self).setUp()
+
+        with override_settings(PASSWORD_HASHERS=self.password_hashers):
+            self.superuser = auth.get_user_model().objects.create_superuser(
+                'testuser', 'testuser@example.com', 'foo')
+
+        if hasattr(self.client, 'force_login'):
+            self.client.force_login(self.superuser)
+        else:  # Django<1.9
+            self.client.login(username='testuser', password='foo')
+        self.cookie = '%s=%s' % (settings.SESSION_COOKIE_NAME,
+            self.client.cookies[settings.SESSION_COOKIE_NAME].value)
+
+        create_object_graph(
+            [model for model, model_admin in get_model_admins(self)])
+
+    def get_urls(self, model, model_admin):
+        """
+        Returns the pages of ``model_admin`` to load, as (name, URL) pairs.
+        """
+        info = (model._meta.app_label, model._meta.model_name)
+        changelist = reverse('admin:%s_%s_changelist' % info)
+        urls = [
+            ('changelist', changelist),
+            ('search', changelist + '?q=test'),
+        ]
+
+        request = RequestFactory().get(changelist)
+        request.user = self.superuser
+        instance = model_admin.get_queryset(request).last()
+        if instance and not model._meta.proxy:
+            urls.append(('change', reverse('admin:%s_%s_change' % info,
+                args=(quote(instance.pk),))))
+        return urls
+
+    def fetch(self, url):
+        """
+        Requests ``url`` and returns the response's status code, or None if
+        the request failed, and how long it took.
+        """
+        request = Request(self.live_server_url + url,
+            headers={'Cookie': self.cookie})
+        start = timeit.default_timer()
+        try:
+            response = urlopen(request, timeout=self.load_timeout)
+            response.read()
+            status = response.getcode()
+        except HTTPError as e:
+            status = e.code
+        except URLError:
+            status = None
+        return status, timeit.default_timer() - start
+
+    def load(self, url):
+        """
+        Requests ``url`` ``load_requests`` times from ``load_threads``
+        threads. Returns the (status, latency) of every request and the total
+        time taken.
+        """
+        pending = queue.Queue()
+        for i in range(self.load_requests):
+            pending.put(url)
+        results = []
+
+        def worker():
+            while True:
+                try:
+                    url = pending.get_nowait()
+                except queue.Empty:
+                    return
+                results.append(self.fetch(url))
+
+        httpd = getattr(self.server_thread, 'httpd', None)
+        if isinstance(httpd, ThreadedWSGIServer):
+            httpd.peak = 0
+
+        threads = [threading.Thread(target=worker)
+            for i in range(self.load_threads)]
+        start = timeit.default_timer()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, timeit.default_timer() - start
+
+    def get_concurrency(self):
+        """
+        Returns the largest number of requests the live server handled at
+        once since the last ``load()``, or 1 if it handles them one by one.
+        """
+        httpd = getattr(self.server_thread, 'httpd', None)
+        return getattr(httpd, 'peak', 1)
+
+    def test_load(self):
+        errors = []
+        for model, model_admin in get_model_admins(self):
+            for view, url in self.get_urls(model, model_admin):
+                results, elapsed = self.load(url)
+                latencies = [latency for status, latency in results]
+                failed = [status for status, latency in results
+                    if status is None or status >= 500]
+
+                self.report.add_load(model, model_admin, view,
+                    requests=len(results),
+                    requests_per_second=len(results) / elapsed,
+                    p50=percentile(latencies, 50),
+                    p95=percentile(latencies, 95),
+                    p99=percentile(latencies, 99),
+                    concurrency=self.get_concurrency(),
+                    errors=len(failed))
+
+                if failed:
+                    errors.append('%d of %d requests to %s failed (%s)' % (
+                        len(failed), len(results), url,
+                        ', '.join(six.text_type(status) for status in
+                            sorted(set(failed), key=six.text_type))))
+
+        if errors:
+            self.fail('\n'.join(errors))
@@ -0,0 +1,168 @@
+import multiprocessing
+import timeit
+import unittest
+import uuid
+
+import django
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import TestCase
+from django.test.testcases import connections_support_transactions
+from django.test.utils import override_settings
+
+from ...scheduling import order_checks
+from ...tests import AdminSiteSmokeTestMixin, get_model_admins
+
+
+def model_label(model):
+    return '%s.%s' % (model._meta.app_label, model._meta.model_name)
+
+
+def select_model_admins(apps=(), models=()):
+    """
+    Returns the registered (model, model_admin) pairs of the ``apps`` (app
+    labels) and ``models`` ('app_label.model_name'), or all of them if
+    neither is given.
+    """
+    models = set(model.lower() for model in models)
+    return [
+        (model, model_admin)
+        for model, model_admin in admin.site._registry.items()
+        if not (apps or models) or model._meta.app_label in apps or
+        model_label(model) in models
+    ]
+
+
+def smoke_test_case(modeladmins, shard_index=0, shard_count=1,
+        report_dir=None):
+    """
+    Returns a test case class running the smoke tests on ``modeladmins``
+    against the current databases, inside transactions that are rolled back,
+    without fixtures, as a superuser with a unique username.
+    """
+    name = 'SmokeAdminTest'
+    if shard_count > 1:
+        name = '%s_%d' % (name, shard_index)
+    return type(name, (AdminSiteSmokeTestMixin, TestCase), {
+        '__module__': __name__,
+        # roll back what the checks write to any database, not only default
+        'multi_db': True,
+        'fixtures': [],
+        'modeladmins': modeladmins,
+        'shard_index': shard_index,
+        'shard_count': shard_count,
+        'report_dir': report_dir,
+        'collect_failures': True,
+        'superuser_username': 'smoke-admin-%s' % uuid.uuid4().hex[:8],
+    })
+
+
+def setup_worker():
+    # processes that aren't forked (the spawn and forkserver start methods)
+    # start without Django set up and with an empty admin site
+    django.setup()
+    admin.autodiscover()
+
+
+def run_shard(args):
+    """
+    Runs the smoke tests on a shard of the ModelAdmins of the models with the
+    given labels. Returns the number of ModelAdmins checked, the number of
+    tests run and the failed tests' ids and tracebacks.
+    """
+    labels, shard_index, shard_count, report_dir = args
+    modeladmins = [
+        (model, model_admin)
+        for model, model_admin in admin.site._registry.items()
+        if model_label(model) in labels
+    ]
+    if not modeladmins:
+        return 0, 0, []
+
+    test_case = smoke_test_case(modeladmins, shard_index, shard_count,
+        report_dir)
+    suite = order_checks(
+        unittest.TestLoader().loadTestsFromTestCase(test_case))
+
+    result = unittest.TestResult()
+    # TestCase rolls back everything the tests write, but mails sent by
+    # ModelAdmins would still go out
+    with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+            ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver']):
+        suite.run(result)
+
+    return len(get_model_admins(test_case)), result.testsRun, [
+        (test.id(), traceback)
+        for test, traceback in result.errors + result.failures
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Runs the admin smoke tests against the configured database, '
+        'inside a transaction that is rolled back, without creating a test '
+        'database.')
+    # the smoke tests report the problems of broken ModelAdmins themselves
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument('--app', action='append', dest='apps',
+            default=[], metavar='APP_LABEL',
+            help='Only check the ModelAdmins of this app. Can be repeated.')
+        parser.add_argument('--model', action='append', dest='models',
+            default=[], metavar='APP_LABEL.MODEL_NAME',
+            help='Only check the ModelAdmin of this model. Can be repeated.')
+        parser.add_argument('--jobs', type=int, default=1,
+            help='Number of processes to split the ModelAdmins over.')
+        parser.add_argument('--report-dir',
+            help='Directory to write JSON and JUnit reports to.')
+
+    def handle(self, **options):
+        # the checks' writes are only rolled back in transactions
+        if not connections_support_transactions():
+            raise CommandError("smoke_admin can't roll back what the checks "
+                "write to databases that don't support transactions.")
+
+        admin.autodiscover()
+        modeladmins = select_model_admins(options['apps'], options['models'])
+        if not modeladmins:
+            raise CommandError('No registered ModelAdmins match the given '
+                'apps and models.')
+
+        labels = sorted(model_label(model) for model, _ in modeladmins)
+        jobs = max(1, min(options['jobs'], len(labels)))
+        shards = [(labels, index, jobs, options['report_dir'])
+            for index in range(jobs)]
+
+        start = timeit.default_timer()
+        if jobs == 1:
+            results = [run_shard(shards[0])]
+        else:
+            # forked processes can't share database connections
+            for connection in connections.all():
+                connection.close()
+            pool = multiprocessing.Pool(jobs, initializer=setup_worker)
+            try:
+                results = pool.map(run_shard, shards)
+            finally:
+                pool.close()
+                pool.join()
+        elapsed = timeit.default_timer() - start
+
+        checked = sum(checked for checked, tests_run, problems in results)
+        tests = sum(tests_run for checked, tests_run, problems in results)
+        problems = [problem for checked, tests_run, problems in results
+            for problem in problems]
+        for test_id, traceback in problems:
+            self.stderr.write('FAIL: %s\n%s' % (test_id, traceback))
+
+        self.stdout.write('Ran %d tests on %d ModelAdmins in %.3fs' % (
+            tests, checked, elapsed))
+        if problems:
+            raise CommandError('%d smoke tests failed.' % len(problems))
+        if checked < len(labels):
+            raise CommandError('Only %d of %d ModelAdmins were checked.' % (
+                checked, len(labels)))
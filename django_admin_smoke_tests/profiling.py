@@ -0,0 +1,126 @@
+import contextlib
+import cProfile
+import heapq
+import itertools
+import os
+import pstats
+import re
+
+try:
+    import tracemalloc
+except ImportError:  # Python<3.4
+    tracemalloc = None
+
+
+class CProfiler(object):
+    """
+    Profiles admin views with cProfile. Any class with the same methods can
+    be used as a test case's ``profiler_class`` instead.
+    """
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def enable(self):
+        self.profile.enable()
+
+    def disable(self):
+        self.profile.disable()
+
+    def dump(self, path):
+        """
+        Writes ``<path>.pstats`` and a summary of the slowest functions to
+        ``<path>.txt``.
+        """
+        self.profile.dump_stats(path + '.pstats')
+        with open(path + '.txt', 'w') as f:
+            stats = pstats.Stats(path + '.pstats', stream=f)
+            stats.sort_stats('cumulative').print_stats(50)
+
+
+@contextlib.contextmanager
+def profiling(profiler):
+    """
+    Runs the body under ``profiler``, if it isn't None.
+    """
+    if profiler is None:
+        yield
+        return
+
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+
+
+class MemoryUsage(object):
+    """
+    The peak memory allocated while running a block, in bytes, and the
+    source lines that had allocated the most memory at its end.
+    """
+    peak = None
+    top = ()
+
+
+@contextlib.contextmanager
+def tracking_memory(enabled, top=5):
+    """
+    Tracks the memory allocated by the body with tracemalloc, if enabled.
+    Yields a ``MemoryUsage`` that is filled in when the body is done.
+    """
+    usage = MemoryUsage()
+    if not enabled:
+        yield usage
+        return
+
+    if tracemalloc is None:
+        raise RuntimeError('Tracking memory requires Python 3.4 or later')
+
+    was_tracing = tracemalloc.is_tracing()
+    if was_tracing:
+        tracemalloc.clear_traces()
+    else:
+        tracemalloc.start()
+
+    try:
+        yield usage
+    finally:
+        current, usage.peak = tracemalloc.get_traced_memory()
+        statistics = tracemalloc.take_snapshot().statistics('lineno')
+        usage.top = [str(statistic) for statistic in statistics[:top]]
+        if not was_tracing:
+            tracemalloc.stop()
+
+
+class SlowestProfiles(object):
+    """
+    Keeps the profiles of the ``count`` slowest views.
+    """
+
+    def __init__(self, count):
+        self.count = count
+        self.profiles = []
+        # breaks ties between equally slow views, profilers can't be compared
+        self._order = itertools.count()
+
+    def add(self, label, elapsed, profiler):
+        item = (elapsed, next(self._order), label, profiler)
+        if len(self.profiles) < self.count:
+            heapq.heappush(self.profiles, item)
+        elif self.profiles and elapsed > self.profiles[0][0]:
+            heapq.heapreplace(self.profiles, item)
+
+    def write(self, directory, prefix):
+        """
+        Dumps the kept profiles to ``directory``, slowest first, named after
+        ``prefix`` and the label they were added with.
+        """
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        slowest = sorted(self.profiles, reverse=True)
+        for rank, (elapsed, order, label, profiler) in enumerate(slowest, 1):
+            name = re.sub(r'[^\w.-]+', '_', '%s-%02d-%s' % (
+                prefix, rank, label))
+            profiler.dump(os.path.join(directory, name))
@@ -0,0 +1,148 @@
+import json
+import os
+from xml.etree import ElementTree
+
+import six
+
+
+def model_admin_label(model, model_admin):
+    return '%s.%s (%s)' % (model._meta.app_label, model._meta.model_name,
+        model_admin.__class__.__name__)
+
+
+class SmokeReport(object):
+    """
+    Collects the measurements of a smoke test case and writes them out as
+    JSON or as a JUnit XML file with the measurements as properties.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.timings = []
+        self.findings = []
+        self.load = []
+        self.failures = []
+
+    def add_timing(self, model, model_admin, view, view_time, render_time,
+            queries=None, memory=None, instrumented=False):
+        # instrumented timings were taken while profiling or tracking memory,
+        # which slow views down
+        self.timings.append({
+            'model_admin': model_admin_label(model, model_admin),
+            'view': view,
+            'view_time': view_time,
+            'render_time': render_time,
+            'time': view_time + render_time,
+            'queries': queries,
+            'memory_peak': memory.peak if memory else None,
+            'memory_top': list(memory.top) if memory else [],
+            'instrumented': instrumented,
+        })
+
+    def add_finding(self, model, model_admin, check, message):
+        self.findings.append({
+            'model_admin': model_admin_label(model, model_admin),
+            'check': check,
+            'message': message,
+        })
+
+    def add_failure(self, model, model_admin, check, exception, traceback,
+            time):
+        self.failures.append({
+            'model_admin': model_admin_label(model, model_admin),
+            'check': check,
+            'exception': exception.__class__.__name__,
+            'message': six.text_type(exception),
+            'traceback': traceback,
+            'time': time,
+        })
+
+    def add_load(self, model, model_admin, view, **results):
+        """
+        Adds the results of load testing ``view``: the number of requests,
+        requests per second, latency percentiles and errors.
+        """
+        results.update({
+            'model_admin': model_admin_label(model, model_admin),
+            'view': view,
+        })
+        self.load.append(results)
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'timings': self.timings,
+            'findings': self.findings,
+            'load': self.load,
+            'failures': self.failures,
+        }
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.as_dict(), f, indent=2, sort_keys=True)
+
+    def write_junit(self, path):
+        suite = ElementTree.Element('testsuite', {
+            'name': self.name,
+            'tests': str(len(self.timings) + len(self.findings) +
+                len(self.load) + len(self.failures)),
+            'failures': str(len(self.failures)),
+        })
+        for timing in self.timings:
+            case = ElementTree.SubElement(suite, 'testcase', {
+                'classname': self.name,
+                'name': '%(model_admin)s %(view)s' % timing,
+                'time': '%.6f' % timing['time'],
+            })
+            properties = ElementTree.SubElement(case, 'properties')
+            for key in ('view_time', 'render_time'):
+                ElementTree.SubElement(properties, 'property', {
+                    'name': key,
+                    'value': '%.6f' % timing[key],
+                })
+            for key in ('queries', 'memory_peak', 'instrumented'):
+                if timing[key] is not None:
+                    ElementTree.SubElement(properties, 'property', {
+                        'name': key,
+                        'value': str(timing[key]),
+                    })
+        for finding in self.findings:
+            case = ElementTree.SubElement(suite, 'testcase', {
+                'classname': self.name,
+                'name': '%(model_admin)s %(check)s' % finding,
+            })
+            ElementTree.SubElement(case, 'system-out').text = \
+                finding['message']
+        for results in self.load:
+            case = ElementTree.SubElement(suite, 'testcase', {
+                'classname': self.name,
+                'name': '%(model_admin)s %(view)s load' % results,
+            })
+            properties = ElementTree.SubElement(case, 'properties')
+            for key, value in sorted(results.items()):
+                if key not in ('model_admin', 'view'):
+                    ElementTree.SubElement(properties, 'property', {
+                        'name': key,
+                        'value': str(value),
+                    })
+        for failure in self.failures:
+            case = ElementTree.SubElement(suite, 'testcase', {
+                'classname': self.name,
+                'name': '%(model_admin)s %(check)s' % failure,
+                'time': '%.6f' % failure['time'],
+            })
+            ElementTree.SubElement(case, 'failure', {
+                'type': failure['exception'],
+                'message': failure['message'],
+            }).text = failure['traceback']
+        ElementTree.ElementTree(suite).write(path, encoding='utf-8')
+
+    def write(self, directory):
+        """
+        Writes ``<name>.json`` and ``<name>.xml`` to ``directory``.
+        """
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        base = os.path.join(directory, self.name)
+        self.write_json(base + '.json')
+        self.write_junit(base + '.xml')
@@ -0,0 +1,179 @@
+import inspect
+import os
+import shutil
+import sqlite3
+import sys
+
+import django
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.db.migrations.loader import MigrationLoader
+from django.test.runner import DiscoverRunner
+
+from .utils import sha1_hexdigest
+
+
+def _module_source(module):
+    path = inspect.getsourcefile(module) or getattr(module, '__file__', None)
+    if not path or not os.path.exists(path):
+        return module.__name__
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _fixture_files(fixtures):
+    directories = [os.path.join(app_config.path, 'fixtures')
+        for app_config in apps.get_app_configs()]
+    directories += list(getattr(settings, 'FIXTURE_DIRS', []))
+
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            if name.split('.')[0] in fixtures:
+                yield os.path.join(directory, name)
+
+
+def schema_fingerprint(connection, fixtures=()):
+    """
+    Returns a hash of everything a migrated test database with ``fixtures``
+    loaded depends on: the installed apps, their models and migrations, the
+    fixture files, the database engine and the Django version.
+    """
+    parts = [django.get_version(), connection.settings_dict['ENGINE']]
+    for app_config in apps.get_app_configs():
+        parts.append(app_config.name)
+        # apps without migrations get their tables from their models
+        if app_config.models_module is not None:
+            parts.append(_module_source(app_config.models_module))
+
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    for key, migration in sorted(loader.disk_migrations.items()):
+        parts.append(_module_source(sys.modules[migration.__module__]))
+
+    parts += sorted(fixtures)
+    for path in sorted(_fixture_files(fixtures)):
+        with open(path, 'rb') as f:
+            parts.append(f.read())
+
+    return sha1_hexdigest(parts)
+
+
+class TemplateDatabaseRunner(DiscoverRunner):
+    """
+    A test runner that migrates SQLite test databases and loads
+    ``template_fixtures`` into them only once, keeping the result in
+    ``template_dir`` until the migrations, models or fixtures change. Each
+    run then starts from a copy of it, which Django clones for each parallel
+    worker. Use it with::
+
+        TEST_RUNNER = 'django_admin_smoke_tests.runner.TemplateDatabaseRunner'
+
+    Test cases can then load the data of the fixtures without loading the
+    fixtures themselves (``fixtures = []``). Other databases are created as
+    usual.
+    """
+    template_dir = os.environ.get('SMOKE_TESTS_TEMPLATE_DIR',
+        '.smoke_tests_databases')
+    template_fixtures = []
+
+    def setup_databases(self, **kwargs):
+        patched = []
+        for alias in connections:
+            connection = connections[alias]
+            if connection.vendor == 'sqlite' and not self.keepdb:
+                connection.creation.create_test_db = \
+                    self.get_create_test_db(connection)
+                patched.append(connection)
+        try:
+            return super(TemplateDatabaseRunner, self).setup_databases(
+                **kwargs)
+        finally:
+            for connection in patched:
+                del connection.creation.create_test_db
+
+    def get_template(self, connection):
+        """
+        Returns the path of the template database for ``connection``,
+        building it first if it doesn't exist.
+        """
+        if not os.path.isdir(self.template_dir):
+            os.makedirs(self.template_dir)
+        path = os.path.join(self.template_dir, '%s-%s.sqlite3' % (
+            connection.alias,
+            schema_fingerprint(connection, self.template_fixtures)))
+        if not os.path.exists(path):
+            self.build_template(connection, path)
+        return path
+
+    def build_template(self, connection, path):
+        creation = connection.creation
+        old_name = connection.settings_dict['NAME']
+        test_settings = connection.settings_dict['TEST']
+        old_test_name = test_settings.get('NAME')
+
+        # build it under a temporary name, so that concurrent runs never copy
+        # a template that isn't complete
+        building = '%s.%d' % (path, os.getpid())
+        test_settings['NAME'] = building
+        try:
+            type(creation).create_test_db(creation, verbosity=self.verbosity,
+                autoclobber=True, serialize=False)
+            if self.template_fixtures:
+                call_command('loaddata', *self.template_fixtures,
+                    verbosity=0, database=connection.alias)
+            connection.close()
+        finally:
+            test_settings['NAME'] = old_test_name
+            settings.DATABASES[connection.alias]['NAME'] = old_name
+            connection.settings_dict['NAME'] = old_name
+        os.rename(building, path)
+
+    def copy_template(self, connection, template):
+        """
+        Copies ``template`` to the test database of ``connection`` and returns
+        the test database's name.
+        """
+        name = connection.creation._get_test_db_name()
+        if not connection.is_in_memory_db(name):
+            shutil.copy(template, name)
+        elif hasattr(sqlite3.Connection, 'backup'):
+            connection.settings_dict['NAME'] = name
+            connection.ensure_connection()
+            source = sqlite3.connect(template)
+            try:
+                source.backup(connection.connection)
+            finally:
+                source.close()
+        else:  # Python<3.7 can't copy into an in-memory database
+            name = os.path.join(self.template_dir, '%s-%d.sqlite3' % (
+                connection.alias, os.getpid()))
+            shutil.copy(template, name)
+        return name
+
+    def get_create_test_db(self, connection):
+        """
+        Returns a replacement for ``connection.creation.create_test_db`` that
+        copies the template database instead of migrating.
+        """
+        def create_test_db(verbosity=1, autoclobber=False, serialize=True,
+                keepdb=False):
+            template = self.get_template(connection)
+            if verbosity >= 1:
+                print('Copying test database for alias %r from %s...' % (
+                    connection.alias, template))
+
+            connection.close()
+            name = self.copy_template(connection, template)
+            settings.DATABASES[connection.alias]['NAME'] = name
+            connection.settings_dict['NAME'] = name
+            connection.ensure_connection()
+
+            if serialize:
+                connection._test_serialized_contents = \
+                    connection.creation.serialize_db_to_string()
+            return name
+        return create_test_db
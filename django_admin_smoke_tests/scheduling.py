@@ -0,0 +1,97 @@
+import unittest
+
+from .utils import JSONStore
+
+
+# cost classes of checks, cheapest first: static checks only introspect
+# ModelAdmins, query checks run queries, render checks render views and
+# write checks also write to the database
+COSTS = ('static', 'query', 'render', 'write')
+
+# cost class of tests that don't declare one
+DEFAULT_COST = 'render'
+
+
+def check_cost(cost):
+    """
+    Declares the cost class of a check, e.g.::
+
+        @check_cost('static')
+        @for_all_model_admins
+        def test_list_per_page(self, model, model_admin):
+            ...
+    """
+    if cost not in COSTS:
+        raise ValueError('Unknown cost %r, expected one of %s' % (
+            cost, ', '.join(COSTS)))
+
+    def decorator(test):
+        test.check_cost = cost
+        check = getattr(test, 'model_admin_check', None)
+        if check is not None:
+            check.check_cost = cost
+        return test
+    return decorator
+
+
+def get_check_cost(fn):
+    return getattr(fn, 'check_cost', DEFAULT_COST)
+
+
+class CheckDurations(JSONStore):
+    """
+    How long each test took when it last ran, by test id, stored in a JSON
+    file so later runs can run quicker tests first.
+    """
+
+    def get(self, test_id):
+        return self.data.get(test_id, 0)
+
+    def add(self, test_id, duration):
+        self.data[test_id] = duration
+
+
+def iter_tests(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            for subtest in iter_tests(test):
+                yield subtest
+        else:
+            yield test
+
+
+def order_checks(suite):
+    """
+    Returns the tests of ``suite`` ordered cheapest first within each test
+    case class: by cost class, then by the duration of their last run if the
+    class has a ``check_durations_path``. Test case classes keep their order.
+    """
+    tests = list(iter_tests(suite))
+    class_order = {}
+    durations = {}
+
+    def key(item):
+        index, test = item
+        class_index = class_order.setdefault(test.__class__, len(class_order))
+        fn = getattr(test, getattr(test, '_testMethodName', ''), None)
+
+        duration = 0
+        path = getattr(test, 'check_durations_path', None)
+        if path:
+            if path not in durations:
+                durations[path] = CheckDurations(path)
+            duration = durations[path].get(test.id())
+
+        return (class_index, COSTS.index(get_check_cost(fn)), duration, index)
+
+    return unittest.TestSuite(
+        test for index, test in sorted(enumerate(tests), key=key))
+
+
+def load_tests(loader, tests, pattern):
+    """
+    Runs the tests of a module cheapest first, when imported into it::
+
+        from django_admin_smoke_tests.scheduling import load_tests
+    """
+    return order_checks(tests)
@@ -1,16 +1,45 @@
+import copy
+import logging
+import os
+import re
 import sys
+import timeit
+import traceback
 
 import django
 
+from django import forms
 from django.contrib import admin, auth
+from django.contrib.admin.utils import get_fields_from_path
+from django.contrib.messages.storage.cookie import CookieStorage
 from django.core.exceptions import ObjectDoesNotExist, PermissionDenied,\
     ValidationError
+from django.db import IntegrityError, connections, router,\
+    transaction
 from django.http.request import QueryDict
+from django.template.response import TemplateResponse
 from django.test import TestCase
 from django.test.client import RequestFactory
+from django.test.html import parse_html
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils.http import urlencode
 
 import six
 
+from .explain import explain, scanned_tables, unindexed_sorts
+from .forms import change_form_data, change_form_errors
+from .incremental import IncrementalResults, fingerprint,\
+    settings_fingerprint
+from .instances import create_instances, create_object_graph,\
+    related_model, remote_field, seed
+from .profiling import CProfiler, SlowestProfiles, profiling,\
+    tracking_memory
+from .report import SmokeReport, model_admin_label
+from .scheduling import CheckDurations, check_cost, get_check_cost
+
+
+logger = logging.getLogger(__name__)
+
 
 class ModelAdminCheckException(Exception):
     def __init__(self, message, original_exception):
@@ -18,47 +47,258 @@ class ModelAdminCheckException(Exception):
         super(ModelAdminCheckException, self).__init__(message)
 
 
+class ModelAdminCheckFailures(ModelAdminCheckException):
+    """
+    Raised by checks in collect mode after running on every ModelAdmin, with
+    the ``ModelAdminCheckException`` of every ModelAdmin that failed.
+    """
+    def __init__(self, check, failures):
+        self.failures = failures
+        message = '%d ModelAdmins failed %s:\n%s' % (len(failures), check,
+            '\n'.join(six.text_type(failure) for failure in failures))
+        super(ModelAdminCheckFailures, self).__init__(
+            message, failures[0].original_exception)
+
+
+class QueryCapture(CaptureQueriesContext):
+    """
+    Captures the queries run on ``connection`` like CaptureQueriesContext,
+    after emptying its query log unless another capture is running. Requests
+    from RequestFactory never reset the log, which only keeps the last 9000
+    queries, so captures would find nothing once it's full.
+    """
+
+    def __enter__(self):
+        depth = getattr(self.connection, '_smoke_captures', 0)
+        if not depth:
+            if hasattr(self.connection, 'queries_log'):
+                self.connection.queries_log.clear()
+            else:  # Django<1.8
+                self.connection.queries = []
+        self.connection._smoke_captures = depth + 1
+        return super(QueryCapture, self).__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.connection._smoke_captures -= 1
+        super(QueryCapture, self).__exit__(exc_type, exc_value, traceback)
+
+
+class RenderedView(object):
+    """
+    The rendered response of a view of a ModelAdmin, with its HTML parsed the
+    first time it's used.
+    """
+
+    def __init__(self, model, model_admin, view, response):
+        self.model = model
+        self.model_admin = model_admin
+        self.view = view
+        self.response = response
+        self._html = None
+
+    @property
+    def content(self):
+        return self.response.content.decode(self.response.charset)
+
+    @property
+    def html(self):
+        if self._html is None:
+            self._html = parse_html(self.content)
+        return self._html
+
+
+def get_model_admins(test, modeladmins=None):
+    """
+    Returns the (model, model_admin) pairs ``test`` should check, in a stable
+    order, with excluded apps and ModelAdmins removed and only the ModelAdmins
+    of ``test``'s shard kept. ``test`` may be a test case class or instance.
+    """
+    if not modeladmins:
+        modeladmins = test.modeladmins or admin.site._registry.items()
+
+    selected = []
+    for model, model_admin in sorted(modeladmins, key=lambda item: (
+            item[0]._meta.app_label, item[0]._meta.model_name)):
+        if model_admin.__class__ in test.exclude_modeladmins:
+            continue
+        if model._meta.app_label in test.exclude_apps:
+            continue
+        selected.append((model, model_admin))
+
+    return selected[test.shard_index::test.shard_count]
+
+
+# views checked against the query, latency and memory budgets of ModelAdmins
+BUDGETED_VIEWS = ('changelist', 'search', 'add', 'change', 'change_post')
+
+
+# cost classes of checks that are skipped for ModelAdmins that failed a
+# cheaper check, and the cost classes of those cheaper checks
+SKIPPED_AFTER_FAILURE = ('render', 'write')
+FAIL_FAST_COSTS = ('static', 'query')
+
+
+def run_model_admin_check(test, fn, model, model_admin):
+    failed = getattr(test, 'failed_model_admins', None)
+    if failed is not None and test.skip_failed_model_admins and\
+            model_admin in failed and\
+            get_check_cost(fn) in SKIPPED_AFTER_FAILURE:
+        return
+
+    results = getattr(test, 'incremental_results', None)
+    if results is not None:
+        check = '%s.%s:%s' % (test.__class__.__name__, fn.__name__,
+            test.settings_fingerprint)
+        model_admin_fingerprint = test.get_fingerprint(model, model_admin)
+        if results.has_passed(model_admin_fingerprint, check) and\
+                not test.full_run:
+            return
+
+    try:
+        fn(test, model, model_admin)
+    except Exception as e:
+        if failed is not None and get_check_cost(fn) in FAIL_FAST_COSTS:
+            failed.add(model_admin)
+        if six.PY2:
+            # Approximate Py3's `raise ModelAdminCheckException from e`
+            # by raising e's traceback with some extra information
+            # prepended to the error message.  Specifically handle PY2
+            # this way because `six.raise_from` just throws away the
+            # second argument and swallows the original exception under
+            # PY2.
+            six.reraise(ModelAdminCheckException(
+                "%s occured while running test '%s' "
+                "on modeladmin %s (%s): %s" % (
+                    e.__class__.__name__,
+                    fn.__name__,
+                    model_admin,
+                    model.__name__,
+                    e),
+                e), None, sys.exc_info()[2])
+        else:
+            six.raise_from(ModelAdminCheckException(
+                "Above exception occured while running test '%s' "
+                "on modeladmin %s (%s)" %
+                (fn.__name__, model_admin, model.__name__),
+                e), e)
+
+    if results is not None:
+        results.add_pass(model_admin_fingerprint, check)
+
+
+def collect_model_admin_check(test, fn, model, model_admin):
+    """
+    Runs a check like ``run_model_admin_check``, but adds its failure to the
+    report and returns it instead of raising it.
+    """
+    start = timeit.default_timer()
+    try:
+        run_model_admin_check(test, fn, model, model_admin)
+    except ModelAdminCheckException as e:
+        test.report.add_failure(model, model_admin, fn.__name__,
+            e.original_exception, traceback.format_exc(),
+            timeit.default_timer() - start)
+        return e
+
+
 def for_all_model_admins(fn):
     def test_deco(self):
-        for model, model_admin in self.modeladmins:
-            if model_admin.__class__ in self.exclude_modeladmins:
+        failures = []
+        for model, model_admin in get_model_admins(self):
+            if not self.collect_failures:
+                run_model_admin_check(self, fn, model, model_admin)
                 continue
-            if model._meta.app_label in self.exclude_apps:
-                continue
-            try:
-                fn(self, model, model_admin)
-            except Exception as e:
-                if six.PY2:
-                    # Approximate Py3's `raise ModelAdminCheckException from e`
-                    # by raising e's traceback with some extra information
-                    # prepended to the error message.  Specifically handle PY2
-                    # this way because `six.raise_from` just throws away the
-                    # second argument and swallows the original exception under
-                    # PY2.
-                    six.reraise(ModelAdminCheckException(
-                        "%s occured while running test '%s' "
-                        "on modeladmin %s (%s): %s" % (
-                            e.__class__.__name__,
-                            fn.__name__,
-                            model_admin,
-                            model.__name__,
-                            e),
-                        e), None, sys.exc_info()[2])
-                else:
-                    six.raise_from(ModelAdminCheckException(
-                        "Above exception occured while running test '%s' "
-                        "on modeladmin %s (%s)" %
-                        (fn.__name__, model_admin, model.__name__),
-                        e), e)
+            failure = collect_model_admin_check(self, fn, model, model_admin)
+            if failure is not None:
+                failures.append(failure)
+        if failures:
+            raise ModelAdminCheckFailures(fn.__name__, failures)
+    test_deco.model_admin_check = fn
     return test_deco
 
 
+def _model_admin_test(fn, model, model_admin, name):
+    def test(self):
+        run_model_admin_check(self, fn, model, model_admin)
+    test.__name__ = str(name)
+    test.check_cost = get_check_cost(fn)
+    return test
+
+
+def shard_test_case(base, count, test_case=TestCase):
+    """
+    Splits the checks of ``base`` into ``count`` test case classes, each of
+    which only checks every ``count``-th ModelAdmin. Django's parallel test
+    runner (``manage.py test --parallel``) schedules test case classes over
+    its worker processes, each with its own clone of the test database, so
+    this spreads the ModelAdmins of a large site over all available cores.
+
+    ``base`` should be a subclass of ``AdminSiteSmokeTestMixin`` that isn't a
+    test case itself, otherwise it would also run all checks unsharded.
+    Returns a dict of the generated classes by name, so a test module can do::
+
+        globals().update(shard_test_case(AdminSiteSmokeTestBase, 8))
+    """
+    shards = {}
+    for index in range(count):
+        name = '%s_%d' % (base.__name__, index)
+        shards[name] = type(name, (base, test_case), {
+            '__module__': base.__module__,
+            'shard_index': index,
+            'shard_count': count,
+        })
+    return shards
+
+
+def model_admin_test_cases(base, test_case=TestCase):
+    """
+    Expands ``base`` into one test case class per ModelAdmin, with one test
+    method per check, e.g. ``AdminSiteSmokeTest_main_post`` with
+    ``test_changelist_view__main_post``. This lets the test runner select,
+    time and parallelise (``manage.py test --parallel``) the checks per
+    ModelAdmin, and rerun just the one that failed.
+
+    The admin site has to be populated when this is called, which is the case
+    when test modules are imported by Django's test runner. As with
+    ``shard_test_case``, ``base`` shouldn't be a test case itself. Returns a
+    dict of the generated classes by name::
+
+        globals().update(model_admin_test_cases(AdminSiteSmokeTestBase))
+    """
+    checks = [
+        name for name in dir(base)
+        if name.startswith('test') and
+        hasattr(getattr(base, name), 'model_admin_check')
+    ]
+
+    test_cases = {}
+    for model, model_admin in get_model_admins(base):
+        suffix = '%s_%s' % (model._meta.app_label, model._meta.model_name)
+        attrs = {
+            '__module__': base.__module__,
+            'modeladmins': [(model, model_admin)],
+        }
+        for check in checks:
+            test_name = '%s__%s' % (check, suffix)
+            attrs[check] = None
+            attrs[test_name] = _model_admin_test(
+                getattr(base, check).model_admin_check, model, model_admin,
+                test_name)
+
+        name = '%s_%s' % (base.__name__, suffix)
+        test_cases[name] = type(name, (base, test_case), attrs)
+    return test_cases
+
+
 class AdminSiteSmokeTestMixin(object):
     modeladmins = None
     exclude_apps = []
     exclude_modeladmins = []
     fixtures = ['django_admin_smoke_tests']
 
+    shard_index = 0
+    shard_count = 1
+
     single_attributes = ['date_hierarchy']
     iter_attributes = [
         'filter_horizontal',
@@ -78,45 +318,334 @@ class AdminSiteSmokeTestMixin(object):
 
     strip_minus_attrs = ('ordering',)
 
-    def setUp(self):
-        super(AdminSiteSmokeTestMixin, self).setUp()
+    # number of rows per page, and twice that, of the changelists compared
+    # when checking whether the number of queries grows with the number of
+    # rows
+    query_count_rows = 3
+
+    # directory to write a JSON and a JUnit XML report of view timings to
+    report_dir = os.environ.get('SMOKE_TESTS_REPORT_DIR')
+
+    # number of rows to generate for every registered model before running the
+    # checks, e.g. 100000 to find admin pages that don't scale
+    smoke_rows = None
+
+    # create an instance of every checked model that doesn't have any, so
+    # that their change views can be checked
+    generate_instances = True
+
+    # how test_queryset evaluates the admin queryset: 'slice' fetches the
+    # first queryset_limit rows, 'iterator' streams all rows without caching
+    # them and 'explain' only has the database explain the query
+    queryset_evaluation = 'slice'
+    queryset_limit = 100
+
+    # rows to generate for every model with search fields before timing
+    # searches on them, e.g. 100 (None searches the existing rows)
+    search_rows = None
+
+    # rows added per step to the tables list filters take their choices from
+    # when checking whether the filters grow with them, e.g. 5 (None skips
+    # the check)
+    list_filter_rows = None
+
+    # maximum number of options a foreign key or many-to-many select in an
+    # admin form may render, e.g. 100 to catch selects listing whole tables
+    # (checked with at least that many related rows)
+    max_select_options = None
+
+    # rows to generate for every model before requesting the first, middle
+    # and last pages of its changelist, by default enough for three pages
+    pagination_rows = None
+
+    # seconds the middle and last changelist pages, and the count queries of
+    # a changelist page, may take before they're reported as findings;
+    # ModelAdmins can set their own with smoke_pagination_budget and
+    # smoke_count_budget (the check is skipped when none of them are set)
+    pagination_budget = None
+    count_budget = None
+
+    # rows to generate for every model before timing and explaining its
+    # changelist sorted by each of its sortable columns, e.g. 100 (None skips
+    # the check)
+    sorting_rows = None
+
+    # fail checks that find likely performance problems (e.g. searches that
+    # scan whole tables) instead of only adding them to the report
+    fail_on_findings = False
+
+    # skip checks that passed before for ModelAdmins whose code, templates
+    # and migrations haven't changed since, unless full_run is set
+    incremental = False
+    incremental_results_path = '.smoke_tests_results.json'
+    full_run = bool(os.environ.get('SMOKE_TESTS_FULL_RUN'))
+
+    # directory to write profiles of the profile_count slowest views to
+    profile_dir = os.environ.get('SMOKE_TESTS_PROFILE_DIR')
+    profile_count = 10
+    profiler_class = CProfiler
+
+    # track the peak memory allocated by every view with tracemalloc, which
+    # slows views down considerably
+    track_memory = False
 
-        self.superuser = auth.get_user_model().objects.create_superuser(
-            'testuser', 'testuser@example.com', 'foo')
+    # keep running checks on the other ModelAdmins when one fails, adding
+    # every failure to the report, and fail once at the end
+    collect_failures = bool(os.environ.get('SMOKE_TESTS_COLLECT_FAILURES'))
 
-        self.factory = RequestFactory()
+    # callables run on the response of every view rendered by
+    # get_rendered_view, as check(test, rendered_view)
+    response_checks = []
 
-        if not self.modeladmins:
-            self.modeladmins = admin.site._registry.items()
+    # skip render and write checks for ModelAdmins that failed static or
+    # query checks, which run first when the tests are ordered by cost (see
+    # django_admin_smoke_tests.scheduling)
+    skip_failed_model_admins = True
 
+    # JSON file to record how long each check took in, to run quicker checks
+    # first in later runs
+    check_durations_path = None
+
+    # username of the superuser the views are requested as
+    superuser_username = 'testuser'
+
+    # the superuser's password doesn't need to be secure, just quick to hash
+    password_hashers = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+    @classmethod
+    def setUpClass(cls):
         try:
             admin.autodiscover()
         except:
             pass
 
+        cls.factory = RequestFactory()
+
+        if not cls.modeladmins:
+            cls.modeladmins = list(admin.site._registry.items())
+
+        cls.report = SmokeReport(cls.__name__)
+        cls.profiles = SlowestProfiles(cls.profile_count)
+        cls._introspection_cache = {}
+        cls._response_cache = {}
+        cls.failed_model_admins = set()
+        cls.check_durations = None
+        if cls.check_durations_path:
+            cls.check_durations = CheckDurations(cls.check_durations_path)
+        cls.incremental_results = None
+        if cls.incremental:
+            cls.incremental_results = IncrementalResults(
+                cls.incremental_results_path)
+            # checks that passed with other settings have to run again
+            cls.settings_fingerprint = settings_fingerprint(cls)
+
+        super(AdminSiteSmokeTestMixin, cls).setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        # Django<1.8 doesn't have setUpTestData
+        parent = super(AdminSiteSmokeTestMixin, cls)
+        if hasattr(parent, 'setUpTestData'):
+            parent.setUpTestData()
+
+        with override_settings(PASSWORD_HASHERS=cls.password_hashers):
+            cls.superuser = auth.get_user_model().objects.create_superuser(
+                cls.superuser_username, 'testuser@example.com', 'foo')
+
+        # generated instances come first, so that they, and not the seeded
+        # rows without many-to-many relations, are checked
+        models = [model for model, model_admin in get_model_admins(cls)]
+        cls.instances = {}
+        if cls.generate_instances:
+            cls.instances = create_object_graph(models)
+
+        if cls.smoke_rows:
+            seed(models, cls.smoke_rows)
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.report_dir:
+            cls.report.write(cls.report_dir)
+        if cls.profile_dir:
+            cls.profiles.write(cls.profile_dir, cls.__name__)
+        if cls.incremental_results is not None:
+            cls.incremental_results.save()
+        if cls.check_durations is not None:
+            cls.check_durations.save()
+        super(AdminSiteSmokeTestMixin, cls).tearDownClass()
+
+    def setUp(self):
+        super(AdminSiteSmokeTestMixin, self).setUp()
+
+        # Django<1.8 doesn't have setUpTestData, and TransactionTestCase
+        # doesn't call it
+        if django.VERSION < (1, 8) or not isinstance(self, TestCase):
+            self.setUpTestData()
+        self._start = timeit.default_timer()
+
+    def tearDown(self):
+        if self.check_durations is not None:
+            self.check_durations.add(self.id(),
+                timeit.default_timer() - self._start)
+        super(AdminSiteSmokeTestMixin, self).tearDown()
+
     def get_request(self, params=None):
         request = self.factory.get('/', params)
 
         request.user = self.superuser
         return request
 
+    def get_instance(self, model, model_admin=None):
+        """
+        Returns an instance of ``model`` to check views against, or None.
+        Given ``model_admin``, only an instance in its ``get_queryset()``,
+        which its change view can show.
+        """
+        instance = self.instances.get(model._meta.concrete_model)
+        if model_admin is None:
+            if instance is None:
+                instance = model._default_manager.last()
+            return instance
+
+        queryset = model_admin.get_queryset(self.get_request())
+        if instance is not None and \
+                queryset.filter(pk=instance.pk).exists():
+            return instance
+        return queryset.last()
+
     def post_request(self, post_data={}, params=None):
-        request = self.factory.post('/', params, post_data=post_data)
+        path = '/?%s' % urlencode(params, doseq=True) if params else '/'
+        request = self.factory.post(path, post_data)
 
         request.user = self.superuser
         request._dont_enforce_csrf_checks = True
+        # successful saves add messages
+        request._messages = CookieStorage(request)
         return request
 
+    def get_change_form_data(self, model, model_admin, item):
+        """
+        Returns POST data that saves ``item`` through the change form of
+        ``model_admin`` with its current values.
+        """
+        rendered = self.get_rendered_view(model, model_admin, 'change',
+            object_id=str(item.pk))
+        return change_form_data(rendered.response)
+
+    def get_view(self, model_admin, view, object_id=None):
+        """
+        Returns a function that calls ``view`` of ``model_admin``:
+        'changelist', 'search' (the changelist searching for 'test'), 'add'
+        or 'change' (of the object with ``object_id``).
+        """
+        if view == 'changelist':
+            return lambda: model_admin.changelist_view(self.get_request())
+        if view == 'search':
+            return lambda: model_admin.changelist_view(
+                self.get_request(params=QueryDict('q=test')))
+        if view == 'add':
+            return lambda: model_admin.add_view(self.get_request())
+        if view == 'change':
+            return lambda: model_admin.change_view(self.get_request(),
+                object_id=object_id)
+        raise ValueError('Unknown view %r' % view)
+
+    def get_views(self, model, model_admin):
+        """
+        Returns the views of ``model_admin`` to check, as (view, object_id)
+        pairs.
+        """
+        views = [('changelist', None), ('search', None), ('add', None)]
+        item = self.get_instance(model, model_admin)
+        if item and not model._meta.proxy:
+            views.append(('change', str(item.pk)))
+        return views
+
+    def get_rendered_view(self, model, model_admin, view, object_id=None):
+        """
+        Returns the ``RenderedView`` of ``view`` of ``model_admin`` (see
+        ``get_view``), rendering it only once per test case class so that
+        checks can share it. Raises PermissionDenied, also only checked once,
+        if the ModelAdmin doesn't allow the view.
+        """
+        key = (model_admin, view, object_id)
+        if key not in self._response_cache:
+            try:
+                response = self.call_view(model, model_admin, view,
+                    self.get_view(model_admin, view, object_id))
+                rendered = RenderedView(model, model_admin, view, response)
+                self.run_response_checks(rendered)
+            except PermissionDenied as e:
+                rendered = e
+            self._response_cache[key] = rendered
+
+        rendered = self._response_cache[key]
+        if isinstance(rendered, PermissionDenied):
+            raise rendered
+        return rendered
+
+    def run_response_checks(self, rendered):
+        """
+        Runs ``response_checks`` on ``rendered``. Responses failing them
+        aren't cached, so they fail every check that renders them.
+        """
+        for check in self.response_checks:
+            check(self, rendered)
+
     def strip_minus(self, attr, val):
         if attr in self.strip_minus_attrs and val[0] == '-':
             val = val[1:]
         return val
 
+    def introspect(self, model_admin, key, compute):
+        """
+        Returns ``compute()``, computed only once per test case class for
+        every ModelAdmin and key, so that checks can share the results of
+        introspecting ModelAdmins.
+        """
+        cache = self._introspection_cache.setdefault(model_admin, {})
+        if key not in cache:
+            cache[key] = compute()
+        return cache[key]
+
     def get_fieldsets(self, model, model_admin):
-        request = self.get_request()
-        return model_admin.get_fieldsets(request, obj=model())
+        return self.introspect(model_admin, 'fieldsets',
+            lambda: model_admin.get_fieldsets(self.get_request(),
+                obj=model()))
+
+    def get_model_fields(self, model, model_admin):
+        def compute():
+            try:
+                return frozenset(model._meta.get_fields())
+            except AttributeError:  # Django<1.10
+                return frozenset(model._meta.get_all_field_names())
+        return self.introspect(model_admin, 'model_fields', compute)
+
+    def get_form_field_names(self, model, model_admin):
+        return self.introspect(model_admin, 'form_field_names',
+            lambda: frozenset(getattr(model_admin.form, 'base_fields', [])))
+
+    def get_list_display(self, model_admin):
+        return self.introspect(model_admin, 'list_display',
+            lambda: model_admin.get_list_display(self.get_request()))
+
+    def get_list_filter(self, model_admin):
+        return self.introspect(model_admin, 'list_filter',
+            lambda: model_admin.get_list_filter(self.get_request()))
+
+    def get_search_fields(self, model_admin):
+        return self.introspect(model_admin, 'search_fields',
+            lambda: model_admin.get_search_fields(self.get_request()))
+
+    def get_fingerprint(self, model, model_admin):
+        return self.introspect(model_admin, 'fingerprint',
+            lambda: fingerprint(model, model_admin))
 
     def get_attr_set(self, model, model_admin):
+        return self.introspect(model_admin, 'attr_set',
+            lambda: self.build_attr_set(model, model_admin))
+
+    def build_attr_set(self, model, model_admin):
         attr_set = []
 
         for attr in self.iter_attributes:
@@ -149,6 +678,429 @@ class AdminSiteSmokeTestMixin(object):
 
         return attr_set
 
+    def capture_queries(self, model):
+        return QueryCapture(connections[router.db_for_read(model)])
+
+    def render(self, response):
+        if isinstance(response, TemplateResponse):
+            response.render()
+        return response
+
+    def get_budget(self, model_admin, attr, view):
+        """
+        Returns the budget for ``view`` of ``model_admin`` from its ``attr``
+        attribute, which is either a number for all views or a dict of numbers
+        by view name (one of ``BUDGETED_VIEWS``). Other views, like the
+        changelists requested to probe searches, filters, pages and sorting,
+        have no budget.
+        """
+        if view not in BUDGETED_VIEWS:
+            return None
+        budget = getattr(model_admin, attr, None)
+        if isinstance(budget, dict):
+            return budget.get(view)
+        return budget
+
+    def get_query_budget(self, model_admin, view):
+        """
+        Returns the maximum number of queries ``view`` of ``model_admin`` may
+        run, taken from its ``smoke_query_budget`` attribute.
+        """
+        return self.get_budget(model_admin, 'smoke_query_budget', view)
+
+    def get_latency_budget(self, model_admin, view):
+        """
+        Returns the maximum number of seconds ``view`` of ``model_admin`` may
+        take to respond and render, taken from its ``smoke_latency_budget``
+        attribute.
+        """
+        return self.get_budget(model_admin, 'smoke_latency_budget', view)
+
+    def get_memory_budget(self, model_admin, view):
+        """
+        Returns the maximum number of bytes ``view`` of ``model_admin`` may
+        allocate at its peak, taken from its ``smoke_memory_budget``
+        attribute. Only checked when ``track_memory`` is set.
+        """
+        return self.get_budget(model_admin, 'smoke_memory_budget', view)
+
+    def call_view(self, model, model_admin, view, get_response, render=True):
+        """
+        Calls ``get_response`` and, unless ``render`` is False, renders the
+        response it returns, recording how long both took, how many queries
+        they ran and optionally how much memory they used in the report, and
+        checking them against the budgets of ``view``.
+        """
+        profiler = self.profiler_class() if self.profile_dir else None
+        instrumented = profiler is not None or self.track_memory
+
+        with self.capture_queries(model) as queries, profiling(profiler),\
+                tracking_memory(self.track_memory) as memory:
+            start = timeit.default_timer()
+            response = get_response()
+            view_time = timeit.default_timer() - start
+
+            start = timeit.default_timer()
+            if render:
+                self.render(response)
+            render_time = timeit.default_timer() - start
+
+        self.report.add_timing(model, model_admin, view, view_time,
+            render_time, len(queries), memory, instrumented)
+        if profiler is not None:
+            self.profiles.add(
+                '%s-%s' % (model_admin_label(model, model_admin), view),
+                view_time + render_time, profiler)
+
+        self.check_budgets(model_admin, view, view_time + render_time,
+            len(queries), memory, instrumented)
+        return response
+
+    def check_budgets(self, model_admin, view, elapsed, queries, memory,
+            instrumented=False):
+        # profiling and tracking memory slow views down too much for their
+        # latency to be checked
+        budget = self.get_latency_budget(model_admin, view)
+        if budget is not None and not instrumented:
+            self.assertLessEqual(elapsed, budget,
+                '%s view of %s took %.3fs, more than its budget of %.3fs' %
+                (view, model_admin, elapsed, budget))
+
+        budget = self.get_query_budget(model_admin, view)
+        if budget is not None:
+            self.assertLessEqual(queries, budget,
+                '%s view of %s ran %d queries, more than its budget of %d' %
+                (view, model_admin, queries, budget))
+
+        budget = self.get_memory_budget(model_admin, view)
+        if budget is not None and memory.peak is not None:
+            self.assertLessEqual(memory.peak, budget,
+                '%s view of %s allocated %d bytes, more than its budget of '
+                '%d. Top allocations:\n%s' %
+                (view, model_admin, memory.peak, budget,
+                    '\n'.join(memory.top)))
+
+    def add_findings(self, model, model_admin, check, findings):
+        """
+        Adds ``findings``, messages about likely performance problems of
+        ``model_admin``, to the report, failing if ``fail_on_findings`` is
+        set.
+        """
+        for message in findings:
+            self.report.add_finding(model, model_admin, check, message)
+        if findings and self.fail_on_findings:
+            self.fail('\n'.join(findings))
+
+    def get_search_field_findings(self, model, model_admin, search_field):
+        """
+        Returns findings about the query searching ``search_field`` runs.
+        """
+        probe = copy.copy(model_admin)
+        probe.search_fields = (search_field,)
+        request = self.get_request()
+        queryset, use_distinct = probe.get_search_results(request,
+            model_admin.get_queryset(request), 'test')
+
+        findings = []
+        try:
+            tables = scanned_tables(queryset)
+        except NotImplementedError:
+            tables = []
+        if tables:
+            findings.append('search field %r scans the whole %s table(s)' %
+                (search_field, ', '.join(tables)))
+
+        joins = search_field.lstrip('^=@').count('__')
+        if joins:
+            findings.append('search field %r joins %d table(s) to match '
+                'every search term' % (search_field, joins))
+        return findings
+
+    def get_list_filter_name(self, list_filter):
+        if isinstance(list_filter, (list, tuple)):
+            list_filter = list_filter[0]
+        return getattr(list_filter, '__name__', list_filter)
+
+    def get_list_filter_model(self, model, list_filter):
+        """
+        Returns the model whose rows ``list_filter`` most likely takes its
+        choices from: the related model for filters on relations, otherwise
+        ``model`` itself.
+        """
+        if isinstance(list_filter, (list, tuple)):
+            list_filter = list_filter[0]
+        if not isinstance(list_filter, six.string_types):
+            return model
+
+        field = get_fields_from_path(model, list_filter)[-1]
+        if remote_field(field):
+            return related_model(field)
+        return model
+
+    def measure_list_filter(self, model, model_admin, list_filter):
+        """
+        Renders the changelist of ``model_admin`` with only ``list_filter``
+        and returns the number of choices it shows and of queries run.
+        """
+        probe = copy.copy(model_admin)
+        probe.list_filter = (list_filter,)
+        request = self.get_request()
+
+        with self.capture_queries(model) as queries:
+            response = self.call_view(model, model_admin,
+                'filter %s' % self.get_list_filter_name(list_filter),
+                lambda: probe.changelist_view(request))
+
+        cl = response.context_data['cl']
+        choices = sum(len(list(spec.choices(cl))) for spec in cl.filter_specs)
+        return choices, len(queries)
+
+    def get_list_filter_findings(self, model, model_admin, list_filter):
+        """
+        Returns findings about ``list_filter`` showing more choices or running
+        more queries as the table it takes its choices from grows.
+        """
+        filter_model = self.get_list_filter_model(model, list_filter)
+        measurements = []
+        for i in range(2):
+            try:
+                with transaction.atomic(
+                        using=router.db_for_write(filter_model)):
+                    create_instances(filter_model, self.list_filter_rows)
+            except (ValueError, IntegrityError) as e:
+                logger.warning('Not checking list filter %s of %s: %s',
+                    self.get_list_filter_name(list_filter),
+                    model_admin_label(model, model_admin), e)
+                return []
+            measurements.append(
+                self.measure_list_filter(model, model_admin, list_filter))
+        (choices, queries), (more_choices, more_queries) = measurements
+
+        if more_choices <= choices and more_queries <= queries:
+            return []
+
+        if filter_model is model:
+            suggestion = 'limit the lookups it returns'
+        else:
+            suggestion = ('use RelatedOnlyFieldListFilter, which only shows '
+                'related objects in use, or a SimpleListFilter with a fixed '
+                'set of lookups')
+        return ['list filter %s grows with the %s table (%d choices and %d '
+            'queries, then %d choices and %d queries after adding %d rows), '
+            '%s' % (
+                self.get_list_filter_name(list_filter),
+                filter_model._meta.db_table,
+                choices, queries, more_choices, more_queries,
+                self.list_filter_rows, suggestion)]
+
+    def get_select_fields(self, model_admin, obj=None):
+        """
+        Returns the foreign key and many-to-many fields of the add form of
+        ``model_admin``, or of its change form of ``obj``, and of its inline
+        formsets that are rendered as select widgets, by name. The names of
+        inline fields are prefixed with their formset's prefix.
+        """
+        request = self.get_request()
+        select_fields = self._select_fields(model_admin,
+            model_admin.get_form(request, obj))
+        for inline in model_admin.get_inline_instances(request, obj):
+            formset = inline.get_formset(request, obj)
+            select_fields.update(
+                ('%s-%s' % (formset.get_default_prefix(), name), field)
+                for name, field in self._select_fields(inline,
+                    formset.form).items())
+        return select_fields
+
+    def _select_fields(self, model_admin, form):
+        no_select = set(model_admin.raw_id_fields) |\
+            set(getattr(model_admin, 'autocomplete_fields', ()))
+        return dict(
+            (name, field) for name, field in form.base_fields.items()
+            if isinstance(field, forms.ModelChoiceField) and
+            name not in no_select
+        )
+
+    def fill_select_fields(self, select_fields):
+        """
+        Adds rows to the tables of ``select_fields`` until each of them has
+        more than ``max_select_options`` options.
+        """
+        for field in select_fields.values():
+            missing = self.max_select_options + 1 - field.queryset.count()
+            if missing > 0:
+                create_instances(field.queryset.model, missing)
+
+    def get_rendered_select_fields(self, response, select_fields):
+        """
+        Returns the bound fields of ``select_fields`` (see
+        ``get_select_fields``) in the form and inline formsets of the admin
+        form view ``response``, by name.
+        """
+        context = response.context_data
+        prefixed_forms = [('', context['adminform'].form)]
+        for inline_admin_formset in context.get('inline_admin_formsets', []):
+            formset = inline_admin_formset.formset
+            prefixed_forms.append(('%s-' % formset.prefix, formset.empty_form))
+
+        return dict(
+            (prefix + name, form[name])
+            for prefix, form in prefixed_forms
+            for name in form.fields if prefix + name in select_fields
+        )
+
+    def get_list_display_probe(self, model_admin, column):
+        """
+        Returns a copy of ``model_admin`` that only displays ``column`` in its
+        changelist.
+        """
+        probe = copy.copy(model_admin)
+        probe.list_display = (column,)
+        probe.list_display_links = None
+        probe.list_editable = ()
+        return probe
+
+    def count_changelist_queries(self, model, model_admin, rows):
+        """
+        Returns the number of queries the changelist of ``model_admin`` runs
+        showing ``rows`` rows per page.
+        """
+        probe = copy.copy(model_admin)
+        probe.list_per_page = rows
+
+        with self.capture_queries(model) as queries:
+            self.render(probe.changelist_view(self.get_request()))
+        return len(queries)
+
+    def measure_changelist_page(self, model, model_admin, name, page=None):
+        """
+        Renders ``page`` of the changelist of ``model_admin``, the default
+        page if None. Returns the response, how long it took and how long each
+        of the count queries it ran took.
+        """
+        params = QueryDict('p=%d' % page if page is not None else '')
+        request = self.get_request(params=params)
+
+        with self.capture_queries(model) as queries:
+            start = timeit.default_timer()
+            response = self.call_view(model, model_admin, 'page %s' % name,
+                lambda: model_admin.changelist_view(request))
+            elapsed = timeit.default_timer() - start
+
+        counts = [float(query['time']) for query in queries.captured_queries
+            if re.search(r'\bCOUNT\(', query['sql'], re.IGNORECASE)]
+        return response, elapsed, counts
+
+    def get_pagination_findings(self, model_admin, name, page, elapsed):
+        """
+        Returns findings about the ``name`` page of the changelist taking
+        longer than the pagination budget.
+        """
+        budget = getattr(model_admin, 'smoke_pagination_budget',
+            self.pagination_budget)
+        if budget is None or elapsed <= budget:
+            return []
+        return ['%s page (p=%d) of the changelist took %.3fs, more than its '
+            'budget of %.3fs; the database reads and skips every row before '
+            'the OFFSET of a page, a custom paginator that seeks by the '
+            'ordering instead (keyset pagination) avoids that' %
+            (name, page, elapsed, budget)]
+
+    def get_count_findings(self, model_admin, counts):
+        """
+        Returns findings about the count queries of a changelist page, which
+        took ``counts`` seconds each, taking longer than the count budget.
+        """
+        budget = getattr(model_admin, 'smoke_count_budget', self.count_budget)
+        if budget is None or sum(counts) <= budget:
+            return []
+
+        suggestions = []
+        if model_admin.show_full_result_count and len(counts) > 1:
+            suggestions.append('set show_full_result_count = False to skip '
+                'counting the unfiltered table')
+        suggestions.append('use a custom paginator that estimates or caches '
+            'the count')
+        return ['%d count queries of the changelist took %.3fs, more than '
+            'their budget of %.3fs; %s' % (len(counts), sum(counts), budget,
+                ', and '.join(suggestions))]
+
+    def fetch_changelist(self, model_admin, request):
+        """
+        Calls the changelist view of ``model_admin`` and fetches the rows of
+        the page it shows, without rendering it.
+        """
+        response = model_admin.changelist_view(request)
+        list(response.context_data['cl'].result_list)
+        return response
+
+    def get_sortable_columns(self, cl):
+        """
+        Returns the columns of the changelist ``cl`` users can sort by, as
+        (index in list_display, name, field sorted by) tuples.
+        """
+        for index, column in enumerate(cl.list_display):
+            order_field = cl.get_ordering_field(column)
+            if order_field is not None:
+                yield index, getattr(column, '__name__', column), order_field
+
+    def get_unindexed_sorts(self, cl):
+        """
+        Returns the steps of the query plan of the page shown by the
+        changelist ``cl`` that sort rows without an index.
+        """
+        try:
+            return unindexed_sorts(cl.queryset[:cl.list_per_page])
+        except NotImplementedError:
+            return []
+
+    def get_sort_findings(self, model, model_admin, index, column,
+            order_field):
+        """
+        Renders the changelist sorted by ``column`` in both directions and
+        returns findings about the sorts needing an index.
+        """
+        steps = []
+        directions = []
+        for direction, param in (('ascending', '%d'), ('descending', '-%d')):
+            param = param % index
+            request = self.get_request(params=QueryDict('o=%s' % param))
+            response = self.call_view(model, model_admin, 'sort %s' % param,
+                lambda: self.fetch_changelist(model_admin, request),
+                render=False)
+
+            sorts = self.get_unindexed_sorts(response.context_data['cl'])
+            if sorts:
+                directions.append(direction)
+                steps += [sort for sort in sorts if sort not in steps]
+
+        if not steps:
+            return []
+        return ['sorting by %s (?o=%d, %s) sorts the rows without an index '
+            '(%s); add an index on %s' % (column, index,
+                ' and '.join(directions), '; '.join(steps), order_field)]
+
+    def get_per_row_query_columns(self, model, model_admin):
+        """
+        Returns the names of the ``list_display`` columns that run extra
+        queries for every row of the changelist.
+        """
+        probes = [
+            (getattr(column, '__name__', column),
+                self.get_list_display_probe(model_admin, column))
+            for column in self.get_list_display(model_admin)
+        ]
+
+        before = [self.count_changelist_queries(model, probe,
+                self.query_count_rows)
+            for name, probe in probes]
+        after = [self.count_changelist_queries(model, probe,
+                self.query_count_rows * 2)
+            for name, probe in probes]
+
+        return [name for (name, probe), b, a in zip(probes, before, after)
+            if a > b]
+
+    @check_cost('static')
     @for_all_model_admins
     def test_specified_fields(self, model, model_admin):
         attr_set = self.get_attr_set(model, model_admin)
@@ -156,14 +1108,8 @@ class AdminSiteSmokeTestMixin(object):
         # FIXME: not all attributes can be used everywhere (e.g. you can't
         # use list_filter with a form field). This will have to be fixed
         # later.
-        try:
-            model_field_names = frozenset(model._meta.get_fields())
-        except AttributeError:  # Django<1.10
-            model_field_names = frozenset(
-                model._meta.get_all_field_names()
-            )
-        form_field_names = frozenset(getattr(model_admin.form,
-            'base_fields', []))
+        model_field_names = self.get_model_fields(model, model_admin)
+        form_field_names = self.get_form_field_names(model, model_admin)
 
         model_instance = model()
 
@@ -193,100 +1139,326 @@ class AdminSiteSmokeTestMixin(object):
             self.assertTrue(has_field_or_attr, '%s not found on %s (%s)' %
                 (attr, model, model_admin,))
 
+    @check_cost('query')
     @for_all_model_admins
     def test_queryset(self, model, model_admin):
         request = self.get_request()
 
-        # TODO: use model_mommy to generate a few instances to query against
         # make sure no errors happen here
-        if hasattr(model_admin, 'get_queryset'):
-            list(model_admin.get_queryset(request))
+        if not hasattr(model_admin, 'get_queryset'):
+            return
 
+        queryset = model_admin.get_queryset(request)
+        if self.queryset_evaluation == 'explain':
+            explain(queryset)
+        elif self.queryset_evaluation == 'iterator':
+            for instance in queryset.iterator():
+                pass
+        else:
+            list(queryset[:self.queryset_limit])
+
+    @check_cost('query')
     @for_all_model_admins
     def test_get_absolute_url(self, model, model_admin):
         if hasattr(model, 'get_absolute_url'):
-            # Use fixture data if it exists
-            instance = model.objects.first()
+            # Use fixture or generated data if it exists
+            instance = self.get_instance(model)
             # Otherwise create a minimal instance
             if not instance:
                 instance = model(pk=1)
             # make sure no errors happen here
             instance.get_absolute_url()
 
+    @check_cost('render')
     @for_all_model_admins
     def test_changelist_view(self, model, model_admin):
-        request = self.get_request()
-
         # make sure no errors happen here
         try:
-            response = model_admin.changelist_view(request)
-            response.render()
-            self.assertEqual(response.status_code, 200)
+            rendered = self.get_rendered_view(model, model_admin,
+                'changelist')
+            self.assertEqual(rendered.response.status_code, 200)
         except PermissionDenied:
             # this error is commonly raised by ModelAdmins that don't allow
             # changelist view
             pass
 
+    @check_cost('render')
     @for_all_model_admins
     def test_changelist_view_search(self, model, model_admin):
-        request = self.get_request(params=QueryDict('q=test'))
-
         # make sure no errors happen here
         try:
-            response = model_admin.changelist_view(request)
-            response.render()
-            self.assertEqual(response.status_code, 200)
+            rendered = self.get_rendered_view(model, model_admin, 'search')
+            self.assertEqual(rendered.response.status_code, 200)
         except PermissionDenied:
             # this error is commonly raised by ModelAdmins that don't allow
             # changelist view.
             pass
 
+    @check_cost('render')
     @for_all_model_admins
     def test_add_view(self, model, model_admin):
-        request = self.get_request()
-
         # make sure no errors happen here
         try:
-            response = model_admin.add_view(request)
-            if isinstance(response, django.template.response.TemplateResponse):
-                response.render()
-            self.assertEqual(response.status_code, 200)
+            rendered = self.get_rendered_view(model, model_admin, 'add')
+            self.assertEqual(rendered.response.status_code, 200)
         except PermissionDenied:
             # this error is commonly raised by ModelAdmins that don't allow
             # adding.
             pass
 
+    @check_cost('render')
     @for_all_model_admins
     def test_change_view(self, model, model_admin):
-        item = model.objects.last()
+        item = self.get_instance(model, model_admin)
         if not item or model._meta.proxy:
             return
-        pk = item.pk
-        request = self.get_request()
 
         # make sure no errors happen here
-        response = model_admin.change_view(request, object_id=str(pk))
-        if isinstance(response, django.template.response.TemplateResponse):
-            response.render()
-        self.assertEqual(response.status_code, 200)
+        try:
+            rendered = self.get_rendered_view(model, model_admin, 'change',
+                object_id=str(item.pk))
+            self.assertEqual(rendered.response.status_code, 200)
+        except PermissionDenied:
+            # this error is commonly raised by ModelAdmins that don't allow
+            # changing.
+            pass
 
+    @check_cost('write')
     @for_all_model_admins
     def test_change_post(self, model, model_admin):
-        item = model.objects.last()
+        item = self.get_instance(model, model_admin)
         if not item or model._meta.proxy:
             return
         pk = item.pk
-        # TODO: If we generate default post_data for post request,
-        # the test would be stronger
-        request = self.post_request()
         try:
-            response = model_admin.change_view(request, object_id=str(pk))
-            if isinstance(response, django.template.response.TemplateResponse):
-                response.render()
-            self.assertEqual(response.status_code, 200)
+            request = self.post_request(
+                post_data=self.get_change_form_data(model, model_admin, item))
+            response = self.call_view(model, model_admin, 'change_post',
+                lambda: model_admin.change_view(request, object_id=str(pk)))
         except ValidationError:
             # This the form was sent, but did not pass it's validation
-            pass
+            return
+        except PermissionDenied:
+            # this error is commonly raised by ModelAdmins that don't allow
+            # changing.
+            return
+
+        # an unchanged form that doesn't save is shown again with its errors
+        if response.status_code != 302:
+            errors = change_form_errors(response)
+            self.fail('Saving the change form unchanged returned %d instead '
+                'of redirecting%s' % (response.status_code,
+                    ''.join('\n' + error for error in errors)))
+
+    @check_cost('render')
+    @for_all_model_admins
+    def test_response_checks(self, model, model_admin):
+        if not self.response_checks:
+            return
+
+        for view, object_id in self.get_views(model, model_admin):
+            try:
+                self.get_rendered_view(model, model_admin, view, object_id)
+            except PermissionDenied:
+                pass
+
+    @check_cost('render')
+    @for_all_model_admins
+    def test_query_budget(self, model, model_admin):
+        if getattr(model_admin, 'smoke_query_budget', None) is None:
+            return
+
+        # budgets are checked when the views are first rendered
+        for view, object_id in self.get_views(model, model_admin):
+            if self.get_query_budget(model_admin, view) is None:
+                continue
+
+            try:
+                self.get_rendered_view(model, model_admin, view, object_id)
+            except PermissionDenied:
+                pass
+
+    @check_cost('write')
+    @for_all_model_admins
+    def test_search_fields(self, model, model_admin):
+        search_fields = self.get_search_fields(model_admin)
+        if not search_fields:
+            return
+
+        if self.search_rows:
+            seed([model], self.search_rows)
+
+        findings = []
+        for search_field in search_fields:
+            probe = copy.copy(model_admin)
+            probe.search_fields = (search_field,)
+            request = self.get_request(params=QueryDict('q=test'))
+            try:
+                self.call_view(model, model_admin, 'search %s' % search_field,
+                    lambda: probe.changelist_view(request))
+            except PermissionDenied:
+                return
+
+            findings += self.get_search_field_findings(model, model_admin,
+                search_field)
+
+        self.add_findings(model, model_admin, 'test_search_fields', findings)
+
+    @check_cost('write')
+    @for_all_model_admins
+    def test_list_filter_cardinality(self, model, model_admin):
+        if self.list_filter_rows is None:
+            return
+
+        findings = []
+        for list_filter in self.get_list_filter(model_admin):
+            try:
+                findings += self.get_list_filter_findings(model, model_admin,
+                    list_filter)
+            except PermissionDenied:
+                return
+
+        self.add_findings(model, model_admin, 'test_list_filter_cardinality',
+            findings)
+
+    @check_cost('write')
+    @for_all_model_admins
+    def test_select_widgets(self, model, model_admin):
+        if self.max_select_options is None:
+            return
+
+        item = self.get_instance(model, model_admin)
+        views = [('add', None)]
+        if item and not model._meta.proxy:
+            views.append(('change', item))
+
+        errors = []
+        for view, obj in views:
+            select_fields = self.get_select_fields(model_admin, obj)
+            self.fill_select_fields(select_fields)
+
+            try:
+                response = self.call_view(model, model_admin, view,
+                    self.get_view(model_admin, view,
+                        str(obj.pk) if obj else None))
+            except PermissionDenied:
+                continue
+
+            rendered = self.get_rendered_select_fields(response,
+                select_fields)
+            for name, bound_field in sorted(rendered.items()):
+                start = timeit.default_timer()
+                options = six.text_type(bound_field).count('<option')
+                self.report.add_timing(model, model_admin,
+                    '%s widget %s' % (view, name), 0,
+                    timeit.default_timer() - start)
+
+                if options > self.max_select_options:
+                    errors.append('%s view: %s renders %d options, more than '
+                        '%d; add it to raw_id_fields or autocomplete_fields' %
+                        (view, name, options, self.max_select_options))
+
+        if errors:
+            self.fail('\n'.join(errors))
+
+    @check_cost('write')
+    @for_all_model_admins
+    def test_changelist_pagination(self, model, model_admin):
+        budgets = [
+            getattr(model_admin, 'smoke_pagination_budget',
+                self.pagination_budget),
+            getattr(model_admin, 'smoke_count_budget', self.count_budget),
+        ]
+        if all(budget is None for budget in budgets):
+            return
+
+        rows = self.pagination_rows or model_admin.list_per_page * 2 + 1
+        seed([model], rows)
+
+        try:
+            response, elapsed, counts = self.measure_changelist_page(model,
+                model_admin, 'first')
+        except PermissionDenied:
+            return
+        findings = self.get_count_findings(model_admin, counts)
+
+        # the first page is 0 (?p=0) on older Django versions, 1 on newer ones
+        cl = response.context_data['cl']
+        pages = [
+            ('middle', cl.page_num + cl.paginator.num_pages // 2),
+            ('last', cl.page_num + cl.paginator.num_pages - 1),
+        ]
+        for name, page in pages:
+            response, elapsed, counts = self.measure_changelist_page(model,
+                model_admin, name, page)
+            findings += self.get_pagination_findings(model_admin, name, page,
+                elapsed)
+
+        self.add_findings(model, model_admin, 'test_changelist_pagination',
+            findings)
+
+    @check_cost('write')
+    @for_all_model_admins
+    def test_changelist_sorting(self, model, model_admin):
+        if self.sorting_rows is None:
+            return
+
+        seed([model], self.sorting_rows)
+
+        request = self.get_request()
+        try:
+            response = self.call_view(model, model_admin, 'sort default',
+                lambda: self.fetch_changelist(model_admin, request),
+                render=False)
+        except PermissionDenied:
+            return
+        cl = response.context_data['cl']
+
+        findings = []
+        steps = self.get_unindexed_sorts(cl)
+        if steps:
+            findings.append('the default ordering (%s) sorts the rows without '
+                'an index (%s)' % (', '.join(cl.queryset.query.order_by),
+                    '; '.join(steps)))
+
+        for index, column, order_field in self.get_sortable_columns(cl):
+            findings += self.get_sort_findings(model, model_admin, index,
+                column, order_field)
+
+        self.add_findings(model, model_admin, 'test_changelist_sorting',
+            findings)
+
+    @check_cost('write')
+    @for_all_model_admins
+    def test_changelist_query_scaling(self, model, model_admin):
+        # pages of query_count_rows and twice as many rows, whatever the size
+        # of the table
+        rows = self.query_count_rows * 2
+        seed([model], rows)
+        if model_admin.get_queryset(self.get_request()).count() < rows:
+            # seed() logs models it can't create rows of
+            return
+
+        try:
+            counts = [
+                self.count_changelist_queries(model, model_admin,
+                    self.query_count_rows),
+                self.count_changelist_queries(model, model_admin, rows),
+            ]
+        except PermissionDenied:
+            return
+
+        if counts[1] <= counts[0]:
+            return
+
+        columns = self.get_per_row_query_columns(model, model_admin)
+        self.fail('changelist of %s runs more queries as rows are added '
+            '(%d queries for %d rows, %d for %d rows), caused by %s' % (
+                model_admin,
+                counts[0], self.query_count_rows,
+                counts[1], self.query_count_rows * 2,
+                ', '.join(columns) if columns else
+                'something other than a single list_display column'))
 
 
 class AdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
@@ -0,0 +1,49 @@
+import hashlib
+import json
+import os
+
+import six
+
+
+def sha1_hexdigest(parts):
+    """
+    Returns the SHA-1 hash of ``parts``, text or bytes, as hex.
+    """
+    sha = hashlib.sha1()
+    for part in parts:
+        sha.update(part.encode('utf-8') if isinstance(part, six.text_type)
+            else part)
+    return sha.hexdigest()
+
+
+class JSONStore(object):
+    """
+    A dict stored in a JSON file at ``path`` between runs. Subclasses define
+    ``merge()`` to combine it with what other test case classes or processes
+    saved since it was loaded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            try:
+                return json.load(f)
+            except ValueError:
+                return {}
+
+    def merge(self, saved):
+        """
+        Returns the data to save, given the data saved in the file now.
+        """
+        saved.update(self.data)
+        return saved
+
+    def save(self):
+        data = self.merge(self.load())
+        with open(self.path, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
@@ -1,21 +1,131 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
 import django
+from django import forms
+from django.conf import settings
+from django.contrib import admin, auth
+from django.contrib.admin.models import LogEntry
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import LiveServerTestCase, TestCase, TransactionTestCase
+from django.test.html import parse_html
 
-from django.test import TestCase
+import six
 
+from django_admin_smoke_tests import incremental,\
+    instances as instances_module
+from django_admin_smoke_tests.explain import explain, scanned_tables,\
+    unindexed_sorts
+from django_admin_smoke_tests.incremental import fingerprint,\
+    settings_fingerprint
+from django_admin_smoke_tests.instances import create_object_graph,\
+    dependency_order, seed
+from django_admin_smoke_tests.load import AdminSiteLoadTestMixin, percentile
+from django_admin_smoke_tests.management.commands import smoke_admin
+from django_admin_smoke_tests.profiling import SlowestProfiles
+from django_admin_smoke_tests.report import SmokeReport
+from django_admin_smoke_tests.runner import schema_fingerprint
+from django_admin_smoke_tests.scheduling import order_checks
 from django_admin_smoke_tests.tests import AdminSiteSmokeTestMixin,\
-    ModelAdminCheckException, for_all_model_admins
-from .admin import ChannelAdmin, FailPostAdmin, ForbiddenPostAdmin, PostAdmin
+    ModelAdminCheckException, ModelAdminCheckFailures, for_all_model_admins,\
+    get_model_admins, model_admin_test_cases, run_model_admin_check,\
+    shard_test_case
+
+from .admin import ChannelAdmin, FailPostAdmin, ForbiddenPostAdmin,\
+    ListFilter, PostAdmin
+from .models import Channel, FailPost, Post
+
+
+class InvalidPostForm(forms.ModelForm):
+    def clean(self):
+        raise forms.ValidationError('Never valid')
 
 
-class AdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
+class InvalidFormPostAdmin(PostAdmin):
+    form = InvalidPostForm
+
+
+class PassingAdminsMixin(object):
+    """
+    Checks the ModelAdmins of the test project that pass every check, without
+    fixtures.
+    """
     fixtures = []
     exclude_apps = ['auth']
     exclude_modeladmins = [FailPostAdmin, ForbiddenPostAdmin]
 
 
+class AdminSiteSmokeTest(PassingAdminsMixin, AdminSiteSmokeTestMixin,
+        TestCase):
+    def test_superuser_password_hashed_cheaply(self):
+        self.assertTrue(self.superuser.password.startswith('md5$'))
+
+    def test_instances_generated(self):
+        post = self.get_instance(Post)
+        self.assertEqual(post, Post.objects.get())
+        self.assertEqual(post.channel, self.get_instance(Channel))
+
+    def test_instance_in_admin_queryset(self):
+        model_admin = PostAdmin(Post, admin.site)
+        self.assertEqual(self.get_instance(Post, model_admin),
+            Post.objects.get())
+
+        model_admin.get_queryset = lambda request: Post.objects.none()
+        self.assertIsNone(self.get_instance(Post, model_admin))
+        self.assertEqual(self.get_views(Post, model_admin),
+            [('changelist', None), ('search', None), ('add', None)])
+
+    def test_change_post_saves(self):
+        post = self.get_instance(Post)
+        model_admin = admin.site._registry[Post]
+        request = self.post_request(
+            post_data=self.get_change_form_data(Post, model_admin, post))
+
+        response = model_admin.change_view(request, object_id=str(post.pk))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(LogEntry.objects.filter(
+            object_id=str(post.pk)).exists())
+
+    def test_change_post_reports_form_errors(self):
+        model_admin = InvalidFormPostAdmin(Post, admin.site)
+        with self.assertRaises(AssertionError) as cm:
+            AdminSiteSmokeTestMixin.test_change_post.model_admin_check(
+                self, Post, model_admin)
+        self.assertIn('returned 200 instead of redirecting\n__all__: Never '
+            'valid', str(cm.exception))
+
+    def test_introspection_cached(self):
+        model_admin = admin.site._registry[Post]
+        self.assertIs(self.get_attr_set(Post, model_admin),
+            self.get_attr_set(Post, model_admin))
+        self.assertIs(self.get_fieldsets(Post, model_admin),
+            self.get_fieldsets(Post, model_admin))
+
+
 class FailAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
     fixtures = []
     exclude_modeladmins = [ForbiddenPostAdmin, PostAdmin, ChannelAdmin]
+    # every check is expected to fail on FailPostAdmin
+    skip_failed_model_admins = False
+
+    def test_render_checks_skipped_after_failure(self):
+        self.skip_failed_model_admins = True
+        self.addCleanup(setattr, self.__class__, 'failed_model_admins',
+            self.failed_model_admins)
+        self.__class__.failed_model_admins = set()
+
+        with self.assertRaises(ModelAdminCheckException):
+            AdminSiteSmokeTestMixin.test_specified_fields(self)
+        self.assertEqual(self.failed_model_admins,
+            set([admin.site._registry[FailPost]]))
+        # would fail on FailPostAdmin otherwise
+        AdminSiteSmokeTestMixin.test_changelist_view_search(self)
 
     @for_all_model_admins
     def test_specified_fields(self, model, model_admin):
@@ -27,13 +137,854 @@ class FailAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
         with self.assertRaises(ModelAdminCheckException):
             super(FailAdminSiteSmokeTest, self).test_changelist_view_search()
 
+    @for_all_model_admins
+    def test_search_fields(self, model, model_admin):
+        with self.assertRaises(ModelAdminCheckException):
+            super(FailAdminSiteSmokeTest, self).test_search_fields()
+
     if django.VERSION >= (1, 8):
         @for_all_model_admins
         def test_changelist_view(self, model, model_admin):
             with self.assertRaises(ModelAdminCheckException):
                 super(FailAdminSiteSmokeTest, self).test_changelist_view()
 
+        @for_all_model_admins
+        def test_changelist_query_scaling(self, model, model_admin):
+            with self.assertRaises(ModelAdminCheckException):
+                super(FailAdminSiteSmokeTest,
+                    self).test_changelist_query_scaling()
+
+        @for_all_model_admins
+        def test_changelist_pagination(self, model, model_admin):
+            self.pagination_budget = 60
+            self.pagination_rows = 1
+            with self.assertRaises(ModelAdminCheckException):
+                super(FailAdminSiteSmokeTest,
+                    self).test_changelist_pagination()
+
+        @for_all_model_admins
+        def test_changelist_sorting(self, model, model_admin):
+            self.sorting_rows = 0
+            with self.assertRaises(ModelAdminCheckException):
+                super(FailAdminSiteSmokeTest, self).test_changelist_sorting()
+
+
+class CollectFailuresAdminSiteSmokeTest(FailAdminSiteSmokeTest):
+    collect_failures = True
+
+    def test_failures_collected(self):
+        failures = len(self.report.failures)
+        with self.assertRaises(ModelAdminCheckFailures) as cm:
+            AdminSiteSmokeTestMixin.test_changelist_view_search(self)
+
+        self.assertEqual(len(cm.exception.failures), 1)
+        failure = self.report.failures[failures]
+        self.assertEqual(failure['model_admin'],
+            'main.failpost (FailPostAdmin)')
+        self.assertEqual(failure['check'], 'test_changelist_view_search')
+        self.assertIn('Traceback', failure['traceback'])
+        # ModelAdmins after the failing one were still checked
+        self.assertIn('main.hasprimaryslug (ModelAdmin)',
+            [timing['model_admin'] for timing in self.report.timings])
+
+
+def check_robots(test, rendered):
+    test.assertEqual(rendered.html.count(
+        parse_html('<meta name="robots" content="NONE,NOARCHIVE">')), 1)
+    test.checked.append((rendered.model_admin, rendered.view))
+
+
+class ResponseChecksAdminSiteSmokeTest(PassingAdminsMixin,
+        AdminSiteSmokeTestMixin, TestCase):
+    response_checks = [check_robots]
+    checked = []
+
+    def test_rendered_once(self):
+        model_admin = admin.site._registry[Post]
+        rendered = self.get_rendered_view(Post, model_admin, 'changelist')
+        self.assertIs(
+            self.get_rendered_view(Post, model_admin, 'changelist'), rendered)
+        self.assertIs(rendered.html, rendered.html)
+        self.assertEqual(self.checked.count((model_admin, 'changelist')), 1)
+
+
+class PaginationAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
+    fixtures = []
+    modeladmins = [(Post, PostAdmin(Post, admin.site))]
+    pagination_rows = 5
+    pagination_budget = 0
+
+    def test_changelist_pagination(self):
+        model_admin = self.modeladmins[0][1]
+        model_admin.list_per_page = 1
+        self.addCleanup(delattr, model_admin, 'list_per_page')
+        super(PaginationAdminSiteSmokeTest, self).test_changelist_pagination()
+
+        views = [timing['view'] for timing in self.report.timings
+            if timing['model_admin'] == 'main.post (PostAdmin)' and
+            timing['view'].startswith('page')]
+        self.assertEqual(views, ['page first', 'page middle', 'page last'])
+        findings = [finding['message'] for finding in self.report.findings
+            if finding['model_admin'] == 'main.post (PostAdmin)' and
+            finding['check'] == 'test_changelist_pagination']
+        self.assertEqual(len(findings), 2)
+        self.assertIn('last page (p=4) of the changelist', findings[1])
+
+    def test_changelist_pagination_opt_in(self):
+        self.pagination_budget = None
+        previous = len(self.report.timings)
+        super(PaginationAdminSiteSmokeTest, self).test_changelist_pagination()
+
+        self.assertEqual(self.report.timings[previous:], [])
+
+    def test_count_findings(self):
+        model_admin = self.modeladmins[0][1]
+        self.count_budget = 0.1
+        self.assertEqual(self.get_count_findings(model_admin, [0.05]), [])
+
+        finding, = self.get_count_findings(model_admin, [0.1, 0.2])
+        self.assertIn('show_full_result_count = False', finding)
+
+
+class SortingAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
+    fixtures = []
+    modeladmins = [(Post, PostAdmin(Post, admin.site))]
+    sorting_rows = 5
+
+    def test_changelist_sorting(self):
+        super(SortingAdminSiteSmokeTest, self).test_changelist_sorting()
+
+        views = [timing['view'] for timing in self.report.timings
+            if timing['model_admin'] == 'main.post (PostAdmin)' and
+            timing['view'].startswith('sort')]
+        self.assertEqual(views[:3], ['sort default', 'sort 1', 'sort -1'])
+        findings = [finding['message'] for finding in self.report.findings
+            if finding['model_admin'] == 'main.post (PostAdmin)' and
+            finding['check'] == 'test_changelist_sorting']
+        self.assertTrue(any(finding.startswith(
+            'sorting by status (?o=3, ascending and descending)')
+            for finding in findings), findings)
+
+    def test_changelist_sorting_opt_in(self):
+        self.sorting_rows = None
+        previous = len(self.report.timings)
+        super(SortingAdminSiteSmokeTest, self).test_changelist_sorting()
+
+        self.assertEqual(self.report.timings[previous:], [])
+
 
 class ForbiddenAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
     fixtures = []
     exclude_modeladmins = [FailPostAdmin, PostAdmin, ChannelAdmin]
+
+
+class ShardedAdminSiteSmokeTest(PassingAdminsMixin, AdminSiteSmokeTestMixin):
+    pass
+
+
+globals().update(shard_test_case(ShardedAdminSiteSmokeTest, 2))
+
+
+class ShardTest(TestCase):
+    def test_shards_partition_model_admins(self):
+        shards = shard_test_case(ShardedAdminSiteSmokeTest, 3)
+        self.assertEqual(len(shards), 3)
+
+        sharded = []
+        for shard in shards.values():
+            sharded += get_model_admins(shard)
+
+        self.assertEqual(len(sharded), len(set(sharded)))
+        self.assertEqual(set(sharded),
+            set(get_model_admins(ShardedAdminSiteSmokeTest)))
+
+
+class ExpandedAdminSiteSmokeTest(PassingAdminsMixin, AdminSiteSmokeTestMixin):
+    pass
+
+
+globals().update(model_admin_test_cases(ExpandedAdminSiteSmokeTest))
+
+
+class ModelAdminTestCasesTest(TestCase):
+    def test_one_test_per_check_and_model_admin(self):
+        test_cases = model_admin_test_cases(ExpandedAdminSiteSmokeTest)
+        self.assertEqual(len(test_cases),
+            len(get_model_admins(ExpandedAdminSiteSmokeTest)))
+
+        test_case = test_cases['ExpandedAdminSiteSmokeTest_main_post']
+        self.assertTrue(callable(
+            getattr(test_case, 'test_changelist_view__main_post')))
+        self.assertIsNone(test_case.test_changelist_view)
+
+
+class PerRowQueryChannelAdmin(ChannelAdmin):
+    list_display = ('title', 'post_count')
+    smoke_query_budget = {'changelist': 1}
+
+    def post_count(self, obj):
+        return obj.post_set.count()
+
+
+class QueryCountAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
+    fixtures = []
+    modeladmins = [(Channel, PerRowQueryChannelAdmin(Channel, admin.site))]
+
+    def test_changelist_query_scaling(self):
+        with self.assertRaises(ModelAdminCheckException) as cm:
+            super(QueryCountAdminSiteSmokeTest,
+                self).test_changelist_query_scaling()
+        self.assertIn('caused by post_count',
+            str(cm.exception.original_exception))
+
+    def test_query_budget(self):
+        with self.assertRaises(ModelAdminCheckException) as cm:
+            super(QueryCountAdminSiteSmokeTest, self).test_query_budget()
+        self.assertIn('changelist view',
+            str(cm.exception.original_exception))
+
+    def test_changelist_view(self):
+        with self.assertRaises(ModelAdminCheckException) as cm:
+            super(QueryCountAdminSiteSmokeTest, self).test_changelist_view()
+        self.assertIn('more than its budget of 1',
+            str(cm.exception.original_exception))
+
+    def test_query_scaling_beyond_first_page(self):
+        model_admin = PerRowQueryChannelAdmin(Channel, admin.site)
+        model_admin.list_per_page = 1
+        with self.assertRaises(AssertionError) as cm:
+            AdminSiteSmokeTestMixin.test_changelist_query_scaling\
+                .model_admin_check(self, Channel, model_admin)
+        self.assertIn('caused by post_count', str(cm.exception))
+
+    @unittest.skipIf(django.VERSION < (1, 8), 'No bounded query log')
+    def test_full_query_log(self):
+        model_admin = PerRowQueryChannelAdmin(Channel, admin.site)
+        connection.queries_log.extend(
+            [{'sql': '', 'time': '0'}] * connection.queries_log.maxlen)
+
+        self.assertGreater(
+            self.count_changelist_queries(Channel, model_admin, 3), 0)
+        with self.assertRaises(AssertionError) as cm:
+            self.call_view(Channel, model_admin, 'changelist',
+                self.get_view(model_admin, 'changelist'))
+        self.assertIn('more than its budget of 1', str(cm.exception))
+
+    def test_budgets_only_for_documented_views(self):
+        model_admin = PerRowQueryChannelAdmin(Channel, admin.site)
+        model_admin.smoke_query_budget = 1
+        self.assertEqual(self.get_query_budget(model_admin, 'change_post'), 1)
+        self.assertIsNone(self.get_query_budget(model_admin, 'sort 1'))
+        self.assertIsNone(self.get_query_budget(model_admin, 'page 2'))
+
+
+class LatencyBudgetChannelAdmin(ChannelAdmin):
+    smoke_latency_budget = {'changelist': 0}
+
+
+class LatencyAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
+    fixtures = []
+    modeladmins = [(Channel, LatencyBudgetChannelAdmin(Channel, admin.site))]
+
+    def test_changelist_view(self):
+        with self.assertRaises(ModelAdminCheckException) as cm:
+            super(LatencyAdminSiteSmokeTest, self).test_changelist_view()
+        self.assertIn('more than its budget',
+            str(cm.exception.original_exception))
+
+        timing = self.report.timings[-1]
+        self.assertEqual(timing['view'], 'changelist')
+        self.assertEqual(timing['model_admin'],
+            'main.channel (LatencyBudgetChannelAdmin)')
+        self.assertFalse(timing['instrumented'])
+
+    @unittest.skipIf(sys.version_info < (3, 4), 'tracemalloc needs Python 3.4')
+    def test_latency_not_checked_while_tracking_memory(self):
+        self.track_memory = True
+        super(LatencyAdminSiteSmokeTest, self).test_changelist_view()
+
+        self.assertTrue(self.report.timings[-1]['instrumented'])
+
+
+class SmokeReportTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_write(self):
+        report = SmokeReport('AdminSiteSmokeTest')
+        report.add_timing(Channel, ChannelAdmin(Channel, admin.site),
+            'changelist', 0.25, 0.5)
+        report.add_failure(Channel, ChannelAdmin(Channel, admin.site),
+            'test_changelist_view', ValueError('broken'), 'Traceback', 0.1)
+        report.write(self.directory)
+
+        with open(os.path.join(self.directory,
+                'AdminSiteSmokeTest.json')) as f:
+            data = json.load(f)
+        self.assertEqual(data['timings'][0]['time'], 0.75)
+        self.assertEqual(data['failures'][0]['message'], 'broken')
+
+        with open(os.path.join(self.directory,
+                'AdminSiteSmokeTest.xml')) as f:
+            junit = f.read()
+        self.assertIn('name="render_time" value="0.500000"', junit)
+        self.assertIn(
+            '<failure message="broken" type="ValueError">Traceback</failure>',
+            junit)
+
+
+class ScaleAdminSiteSmokeTest(PassingAdminsMixin, AdminSiteSmokeTestMixin,
+        TestCase):
+    smoke_rows = 150
+
+    def test_rows_seeded(self):
+        self.assertGreaterEqual(Post.objects.count(), 150)
+        self.assertGreaterEqual(Channel.objects.count(), 150)
+
+
+class InstancesTest(TestCase):
+    def test_dependency_order(self):
+        self.assertEqual(dependency_order([FailPost, Channel]),
+            [Channel, auth.get_user_model(), FailPost])
+
+    def test_create_object_graph(self):
+        instances = create_object_graph([Channel, FailPost])
+
+        self.assertEqual(Channel.objects.count(), 1)
+        self.assertEqual(FailPost.objects.get(), instances[FailPost])
+        self.assertEqual(instances[FailPost].channel, instances[Channel])
+        self.assertEqual(list(instances[Channel].followers.all()),
+            [instances[auth.get_user_model()]])
+
+        self.assertEqual(create_object_graph([Channel])[Channel],
+            instances[Channel])
+
+    def test_create_object_graph_skips_unknown_fields(self):
+        def field_value(field, n):
+            if field.model is Post:
+                raise ValueError("Can't generate a value for %s" % field)
+            return original(field, n)
+
+        original = instances_module.field_value
+        instances_module.field_value = field_value
+        try:
+            instances = create_object_graph([Channel, FailPost])
+        finally:
+            instances_module.field_value = original
+
+        self.assertIn(Channel, instances)
+        self.assertNotIn(FailPost, instances)
+        self.assertFalse(Post.objects.exists())
+
+    def test_seed(self):
+        seed([Post], 5, batch_size=2)
+
+        self.assertEqual(Post.objects.count(), 5)
+        self.assertEqual(Channel.objects.count(), 5)
+        self.assertEqual(
+            Post.objects.values('channel').distinct().count(), 2)
+
+    def test_field_value_cycles_choices(self):
+        field = Post._meta.get_field('status')
+        self.assertEqual(
+            [instances_module.field_value(field, n) for n in range(3)],
+            [0, 1, 0])
+
+    def test_seed_caps_unique_choices(self):
+        field = Channel._meta.get_field('enrollment')
+        field._unique = True
+        try:
+            seed([Channel], 5)
+        finally:
+            field._unique = False
+
+        self.assertEqual(Channel.objects.count(), 2)
+
+    def test_seed_skips_integrity_errors(self):
+        def field_value(field, n):
+            if field.model is Channel and field.name == 'title':
+                return 'duplicate'
+            return original(field, n)
+
+        original = instances_module.field_value
+        instances_module.field_value = field_value
+        try:
+            seed([Channel], 3)
+        finally:
+            instances_module.field_value = original
+
+        self.assertFalse(Channel.objects.exists())
+
+
+class QuerysetEvaluationAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
+    fixtures = []
+    modeladmins = [(Post, PostAdmin(Post, admin.site))]
+
+    def test_queryset_iterator(self):
+        self.queryset_evaluation = 'iterator'
+        self.test_queryset()
+
+    def test_queryset_explain(self):
+        self.queryset_evaluation = 'explain'
+        self.test_queryset()
+
+
+class ExplainTest(TestCase):
+    def test_explain(self):
+        plan = explain(Post.objects.filter(title='test'))
+        self.assertTrue(plan)
+        self.assertFalse(Post.objects.exists())
+
+    def test_unindexed_sorts(self):
+        self.assertTrue(unindexed_sorts(Post.objects.order_by('status')))
+        self.assertFalse(unindexed_sorts(Post.objects.order_by('pk')))
+
+    def test_empty_queryset(self):
+        self.assertEqual(explain(Post.objects.none()), [])
+        self.assertEqual(scanned_tables(Post.objects.none()), [])
+        self.assertEqual(unindexed_sorts(Post.objects.none()), [])
+
+
+class EmptyQuerysetPostAdmin(PostAdmin):
+    def get_queryset(self, request):
+        return super(EmptyQuerysetPostAdmin, self).get_queryset(
+            request).none()
+
+
+class EmptyQuerysetAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
+    fixtures = []
+    modeladmins = [(Post, EmptyQuerysetPostAdmin(Post, admin.site))]
+    queryset_evaluation = 'explain'
+
+
+class IncrementalAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
+    fixtures = []
+    modeladmins = [(Channel, ChannelAdmin(Channel, admin.site))]
+    incremental = True
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.incremental_results_path = os.path.join(cls.directory,
+            'results.json')
+        super(IncrementalAdminSiteSmokeTest, cls).setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super(IncrementalAdminSiteSmokeTest, cls).tearDownClass()
+        with open(cls.incremental_results_path) as f:
+            assert json.load(f)
+        shutil.rmtree(cls.directory)
+
+    def test_passed_checks_skipped(self):
+        calls = []
+
+        def check(test, model, model_admin):
+            calls.append(model_admin)
+
+        model, model_admin = self.modeladmins[0]
+        run_model_admin_check(self, check, model, model_admin)
+        run_model_admin_check(self, check, model, model_admin)
+        self.assertEqual(len(calls), 1)
+
+        self.full_run = True
+        run_model_admin_check(self, check, model, model_admin)
+        self.assertEqual(len(calls), 2)
+
+    def test_fingerprint(self):
+        channel_admin = ChannelAdmin(Channel, admin.site)
+        self.assertEqual(fingerprint(Channel, channel_admin),
+            fingerprint(Channel, ChannelAdmin(Channel, admin.site)))
+        self.assertNotEqual(fingerprint(Channel, channel_admin),
+            fingerprint(Post, PostAdmin(Post, admin.site)))
+
+    def test_fingerprint_includes_list_filters_and_related_models(self):
+        classes = []
+        original = incremental._class_sources
+        incremental._class_sources = lambda cls: classes.append(cls) or []
+        try:
+            fingerprint(Post, PostAdmin(Post, admin.site))
+        finally:
+            incremental._class_sources = original
+
+        self.assertIn(ListFilter, classes)
+        self.assertIn(Channel, classes)
+        self.assertIn(auth.get_user_model(), classes)
+
+    def test_settings_fingerprint(self):
+        class OtherSettings(self.__class__):
+            query_count_rows = 10
+
+        self.assertEqual(settings_fingerprint(self.__class__),
+            self.settings_fingerprint)
+        self.assertNotEqual(settings_fingerprint(OtherSettings),
+            self.settings_fingerprint)
+
+
+class SearchChannelAdmin(ChannelAdmin):
+    search_fields = ['title', 'followers__email']
+
+
+class SearchAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
+    fixtures = []
+    modeladmins = [(Channel, SearchChannelAdmin(Channel, admin.site))]
+    search_rows = 10
+
+    def test_search_fields(self):
+        super(SearchAdminSiteSmokeTest, self).test_search_fields()
+
+        self.assertEqual(Channel.objects.count(), 10)
+
+    def test_search_rows_opt_in(self):
+        self.search_rows = None
+        channels = Channel.objects.count()
+        super(SearchAdminSiteSmokeTest, self).test_search_fields()
+
+        self.assertEqual(Channel.objects.count(), channels)
+        messages = [finding['message'] for finding in self.report.findings]
+        self.assertIn("search field 'title' scans the whole main_channel "
+            "table(s)", messages)
+        self.assertIn("search field 'followers__email' joins 1 table(s) to "
+            "match every search term", messages)
+
+    def test_fail_on_findings(self):
+        self.fail_on_findings = True
+        with self.assertRaises(ModelAdminCheckException):
+            super(SearchAdminSiteSmokeTest, self).test_search_fields()
+
+
+class ListFilterAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
+    fixtures = []
+    modeladmins = [(Post, PostAdmin(Post, admin.site))]
+    list_filter_rows = 5
+
+    def test_list_filter_cardinality(self):
+        super(ListFilterAdminSiteSmokeTest,
+            self).test_list_filter_cardinality()
+
+        messages = [finding['message'] for finding in self.report.findings
+            if finding['check'] == 'test_list_filter_cardinality']
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(messages[0].startswith(
+            'list filter author grows with the auth_user table'))
+        self.assertTrue(messages[1].startswith(
+            'list filter channel grows with the main_channel table'))
+        self.assertIn('RelatedOnlyFieldListFilter', messages[1])
+
+    def test_list_filter_cardinality_opt_in(self):
+        self.list_filter_rows = None
+        channels = Channel.objects.count()
+        super(ListFilterAdminSiteSmokeTest,
+            self).test_list_filter_cardinality()
+
+        self.assertEqual(Channel.objects.count(), channels)
+
+    def test_list_filter_cardinality_skips_unseedable_models(self):
+        def field_value(field, n):
+            if field.model is Channel:
+                raise ValueError("Can't generate a value for %s" % field)
+            return original(field, n)
+
+        previous = len(self.report.findings)
+        original = instances_module.field_value
+        instances_module.field_value = field_value
+        try:
+            super(ListFilterAdminSiteSmokeTest,
+                self).test_list_filter_cardinality()
+        finally:
+            instances_module.field_value = original
+
+        messages = [finding['message']
+            for finding in self.report.findings[previous:]]
+        self.assertEqual(len(messages), 1)
+        self.assertTrue(messages[0].startswith('list filter author'))
+
+
+class RawIdPostAdmin(PostAdmin):
+    raw_id_fields = ['author', 'channel']
+
+
+class PostInline(admin.TabularInline):
+    model = Post
+    fields = ('title', 'author')
+
+
+class InlineChannelAdmin(ChannelAdmin):
+    inlines = [PostInline]
+
+
+class SelectWidgetAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
+    fixtures = []
+    modeladmins = [(Post, PostAdmin(Post, admin.site))]
+    max_select_options = 3
+
+    def test_select_widgets(self):
+        with self.assertRaises(ModelAdminCheckException) as cm:
+            super(SelectWidgetAdminSiteSmokeTest, self).test_select_widgets()
+
+        message = str(cm.exception.original_exception)
+        self.assertIn('author renders 4 options, more than 3', message)
+        # not in the fieldsets
+        self.assertNotIn('channel', message)
+
+    def test_select_widgets_raw_id_fields(self):
+        self.modeladmins = [(Post, RawIdPostAdmin(Post, admin.site))]
+        super(SelectWidgetAdminSiteSmokeTest, self).test_select_widgets()
+
+    def test_select_widgets_change_form_and_inlines(self):
+        self.modeladmins = [(Channel, InlineChannelAdmin(Channel, admin.site))]
+        with self.assertRaises(ModelAdminCheckException) as cm:
+            super(SelectWidgetAdminSiteSmokeTest, self).test_select_widgets()
+
+        message = str(cm.exception.original_exception)
+        self.assertIn('add view: post_set-author renders 4 options', message)
+        self.assertIn('change view: post_set-author renders 4 options',
+            message)
+        self.assertIn('change view: followers renders 4 options', message)
+
+
+class ProfilingAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
+    fixtures = []
+    modeladmins = [(Channel, ChannelAdmin(Channel, admin.site))]
+    profile_count = 2
+
+    @classmethod
+    def setUpClass(cls):
+        cls.profile_dir = tempfile.mkdtemp()
+        super(ProfilingAdminSiteSmokeTest, cls).setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super(ProfilingAdminSiteSmokeTest, cls).tearDownClass()
+        names = sorted(os.listdir(cls.profile_dir))
+        shutil.rmtree(cls.profile_dir)
+        assert len(names) == 4, names
+        assert names[0].startswith('ProfilingAdminSiteSmokeTest-01-main.'
+            'channel_ChannelAdmin_-'), names
+
+    def test_changelist_view(self):
+        super(ProfilingAdminSiteSmokeTest, self).test_changelist_view()
+        self.assertTrue(self.profiles.profiles)
+
+
+class SlowestProfilesTest(TestCase):
+    def test_keeps_slowest(self):
+        profiles = SlowestProfiles(2)
+        for elapsed in [3, 1, 4, 1, 5]:
+            profiles.add(str(elapsed), elapsed, None)
+        self.assertEqual(sorted(label for e, o, label, p
+            in profiles.profiles), ['4', '5'])
+
+
+class MemoryBudgetChannelAdmin(ChannelAdmin):
+    smoke_memory_budget = {'changelist': 1}
+
+
+@unittest.skipIf(sys.version_info < (3, 4), 'tracemalloc needs Python 3.4')
+class MemoryAdminSiteSmokeTest(AdminSiteSmokeTestMixin, TestCase):
+    fixtures = []
+    modeladmins = [(Channel, MemoryBudgetChannelAdmin(Channel, admin.site))]
+    track_memory = True
+
+    def test_changelist_view(self):
+        with self.assertRaises(ModelAdminCheckException) as cm:
+            super(MemoryAdminSiteSmokeTest, self).test_changelist_view()
+        self.assertIn('more than its budget of 1. Top allocations:',
+            str(cm.exception.original_exception))
+
+        timing = self.report.timings[-1]
+        self.assertGreater(timing['memory_peak'], 1)
+        self.assertTrue(timing['memory_top'])
+
+
+class AdminSiteLoadTest(PassingAdminsMixin, AdminSiteLoadTestMixin,
+        LiveServerTestCase):
+    load_threads = 2
+    load_requests = 4
+
+    def test_load(self):
+        super(AdminSiteLoadTest, self).test_load()
+
+        results = self.report.load[0]
+        self.assertEqual(results['model_admin'], 'main.channel (ChannelAdmin)')
+        self.assertEqual(results['requests'], 4)
+        self.assertEqual(results['errors'], 0)
+        self.assertGreater(results['requests_per_second'], 0)
+
+    def test_change_url_from_admin_queryset(self):
+        views = [view for view, url in self.get_urls(Post,
+            EmptyQuerysetPostAdmin(Post, admin.site))]
+        self.assertEqual(views, ['changelist', 'search'])
+
+    @unittest.skipIf(django.VERSION < (1, 10), "Needs a threaded live server")
+    def test_requests_overlap(self):
+        # two requests to a page taking 0.2s take about as long as one
+        results, elapsed = self.load('/main/slow/')
+        self.assertEqual([status for status, latency in results], [200] * 4)
+        self.assertGreaterEqual(self.get_concurrency(), 2)
+        self.assertLess(elapsed, 4 * 0.2)
+
+
+class PercentileTest(TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3], 95), 3)
+        self.assertIsNone(percentile([], 50))
+
+
+class OrderChecksTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def get_order(self, test_case):
+        suite = unittest.TestLoader().loadTestsFromTestCase(test_case)
+        return [test._testMethodName for test in order_checks(suite)]
+
+    def test_cheapest_first(self):
+        order = self.get_order(AdminSiteSmokeTest)
+
+        self.assertEqual(order[:3], ['test_specified_fields',
+            'test_get_absolute_url', 'test_queryset'])
+        self.assertLess(order.index('test_add_view'),
+            order.index('test_change_post'))
+        self.assertEqual(order[-1], 'test_select_widgets')
+
+    def test_durations(self):
+        path = os.path.join(self.directory, 'durations.json')
+        test_id = '%s.%s.test_add_view' % (__name__,
+            DurationsAdminSiteSmokeTest.__name__)
+        with open(path, 'w') as f:
+            json.dump({test_id: 10}, f)
+        DurationsAdminSiteSmokeTest.check_durations_path = path
+        self.addCleanup(setattr, DurationsAdminSiteSmokeTest,
+            'check_durations_path', None)
+
+        order = self.get_order(DurationsAdminSiteSmokeTest)
+        self.assertLess(order.index('test_changelist_view'),
+            order.index('test_add_view'))
+        self.assertLess(order.index('test_add_view'),
+            order.index('test_change_post'))
+
+
+class DurationsAdminSiteSmokeTest(PassingAdminsMixin, AdminSiteSmokeTestMixin,
+        TestCase):
+    pass
+
+
+class TransactionAdminSiteSmokeTest(AdminSiteSmokeTestMixin,
+        TransactionTestCase):
+    fixtures = []
+    modeladmins = [(Post, PostAdmin(Post, admin.site))]
+
+    def test_superuser_created(self):
+        self.assertTrue(auth.get_user_model().objects.filter(
+            pk=self.superuser.pk, is_superuser=True).exists())
+        self.assertEqual(Post.objects.get(), self.instances[Post])
+
+
+# the command's test case closes the database connections when it's done,
+# which would end the transaction of a TestCase
+class SmokeAdminCommandTest(TransactionTestCase):
+    multi_db = True
+
+    def test_filtered(self):
+        stdout = six.StringIO()
+        call_command('smoke_admin', models=['main.Post', 'main.channel'],
+            stdout=stdout)
+
+        self.assertIn('on 2 ModelAdmins', stdout.getvalue())
+        self.assertFalse(
+            auth.get_user_model().objects.filter(is_superuser=True).exists())
+
+    def test_failures(self):
+        stderr = six.StringIO()
+        with self.assertRaises(CommandError):
+            call_command('smoke_admin', models=['main.failpost'],
+                stdout=six.StringIO(), stderr=stderr)
+        self.assertIn('test_specified_fields', stderr.getvalue())
+
+    def test_no_model_admins(self):
+        with self.assertRaises(CommandError):
+            call_command('smoke_admin', apps=['missing'])
+
+    def test_rolls_back_other_databases(self):
+        def test_write_other(self):
+            Channel.objects.using('other').create(slug='other',
+                title='other')
+
+        test_case = smoke_admin.smoke_test_case(
+            [(Channel, ChannelAdmin(Channel, admin.site))])
+        test_case.test_write_other = test_write_other
+        result = unittest.TestResult()
+        unittest.TestLoader().loadTestsFromName('test_write_other',
+            test_case).run(result)
+
+        self.assertTrue(result.wasSuccessful(), result.errors)
+        self.assertFalse(Channel.objects.using('other').exists())
+
+    def test_unchecked_model_admins(self):
+        # e.g. worker processes started with an empty admin site
+        self.assertEqual(smoke_admin.run_shard((['main.missing'], 0, 1, None)),
+            (0, 0, []))
+
+        original = smoke_admin.run_shard
+        smoke_admin.run_shard = lambda args: (1, 10, [])
+        try:
+            with self.assertRaises(CommandError) as cm:
+                call_command('smoke_admin', models=['main.Post',
+                    'main.channel'], stdout=six.StringIO())
+        finally:
+            smoke_admin.run_shard = original
+        self.assertIn('Only 1 of 2 ModelAdmins', str(cm.exception))
+
+    def test_transactions_required(self):
+        original = smoke_admin.connections_support_transactions
+        smoke_admin.connections_support_transactions = lambda: False
+        try:
+            with self.assertRaises(CommandError) as cm:
+                call_command('smoke_admin', models=['main.Post'])
+        finally:
+            smoke_admin.connections_support_transactions = original
+        self.assertIn("can't roll back", str(cm.exception))
+
+
+class SchemaFingerprintTest(TestCase):
+    def test_fingerprint(self):
+        self.assertEqual(schema_fingerprint(connection),
+            schema_fingerprint(connection))
+        self.assertNotEqual(schema_fingerprint(connection),
+            schema_fingerprint(connection, ['initial_data']))
+
+
+class TemplateDatabaseRunnerTest(TestCase):
+    def run_tests(self, template_dir):
+        env = dict(os.environ, SMOKE_TESTS_TEMPLATE_DIR=template_dir)
+        process = subprocess.Popen([sys.executable, 'manage.py', 'test',
+                '--testrunner',
+                'django_admin_smoke_tests.runner.TemplateDatabaseRunner',
+                'test_project.main.tests.PercentileTest'],
+            cwd=settings.BASE_DIR or '.', env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        output = process.communicate()[0].decode('utf-8')
+        self.assertEqual(process.returncode, 0, output)
+        return output
+
+    def test_template_reused(self):
+        template_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, template_dir)
+
+        output = self.run_tests(template_dir)
+        self.assertIn('Creating test database', output)
+        self.assertIn('Copying test database', output)
+        templates = sorted(os.listdir(template_dir))
+        self.assertTrue(templates)
+
+        # the second run copies the template without migrating
+        output = self.run_tests(template_dir)
+        self.assertNotIn('Creating test database', output)
+        self.assertIn('Copying test database', output)
+        self.assertEqual(sorted(os.listdir(template_dir)), templates)
@@ -1,4 +1,12 @@
+import time
+
 from django.conf.urls import url
+from django.http import HttpResponse
+
+
+def slow(request):
+    time.sleep(0.2)
+    return HttpResponse()
 
 
 urlpatterns = [
@@ -7,4 +15,5 @@ urlpatterns = [
         name="hasprimaryslug-detail"),
     url(r'^hasprimaryuuid/(?P<pk>[\w-]+)/$', lambda **kwargs: '',
         name="hasprimaryuuid-detail"),
+    url(r'^slow/$', slow, name="slow"),
 ]